@@ -1,130 +1,18 @@
+import queue
+import threading
 import tkinter as tk
-from tkinter import messagebox, ttk
-import random
-
-
-# FIFO Paging Algorithm
-def fifo_paging(reference_string, num_frames):
-    frames = []
-    hits = 0
-    misses = 0
-    swap_space = []
-    frame_orders = []
-
-    for i, page in enumerate(reference_string):
-        if page in frames:
-            hits += 1
-            frame_orders.append((list(frames), " --> Hit", list(swap_space), i + 1))
-        else:
-            if len(frames) < num_frames:
-                frames.append(page)
-                frame_orders.append((list(frames), " --> Miss (No change)", list(swap_space), i + 1))
-            else:
-                evicted_page = frames.pop(0)
-                frames.append(page)
-                swap_space.append(evicted_page)
-                frame_orders.append((list(frames), f" --> Miss (Removed -> {evicted_page})", list(swap_space), i + 1))
-            misses += 1
-
-    hit_ratio = hits / len(reference_string)
-    miss_ratio = misses / len(reference_string)
-    return hits, misses, hit_ratio, miss_ratio, frame_orders
-
-
-# LRU Paging Algorithm
-def lru_paging(reference_string, num_frames):
-    frames = []
-    hits = 0
-    misses = 0
-    swap_space = []
-    frame_orders = []
-
-    for i, page in enumerate(reference_string):
-        if page in frames:
-            hits += 1
-            frames.remove(page)  # Remove the page to update its position
-            frames.append(page)  # Re-add the page to mark it as recently used
-            frame_orders.append((list(frames), " --> Hit", list(swap_space), i + 1))
-        else:
-            misses += 1
-            if len(frames) < num_frames:
-                frames.append(page)
-                frame_orders.append((list(frames), " --> Miss (No change)", list(swap_space), i + 1))
-            else:
-                evicted_page = frames.pop(0)  # Remove the least recently used page
-                frames.append(page)
-                swap_space.append(evicted_page)
-                frame_orders.append((list(frames), f" --> Miss (Removed -> {evicted_page})", list(swap_space), i + 1))
-
-    hit_ratio = hits / len(reference_string)
-    miss_ratio = misses / len(reference_string)
-    return hits, misses, hit_ratio, miss_ratio, frame_orders
-
-
-# Optimal Paging Algorithm
-def optimal_paging(reference_string, num_frames):
-    frames = []
-    hits = 0
-    misses = 0
-    swap_space = []
-    frame_orders = []
-
-    for i, page in enumerate(reference_string):
-        if page in frames:
-            hits += 1
-            frame_orders.append((list(frames), " --> Hit", list(swap_space), i + 1))
-        else:
-            if len(frames) < num_frames:
-                frames.append(page)
-                frame_orders.append((list(frames), " --> Miss (No change)", list(swap_space), i + 1))
-            else:
-                # Find the page to evict
-                future_uses = {frame: None for frame in frames}
-                for j in range(i + 1, len(reference_string)):
-                    if reference_string[j] in future_uses and future_uses[reference_string[j]] is None:
-                        future_uses[reference_string[j]] = j
-
-                # Evict the page that won't be used for the longest time
-                evicted_page = max(future_uses,
-                                   key=lambda x: future_uses[x] if future_uses[x] is not None else float('inf'))
-                frames.remove(evicted_page)
-                frames.append(page)
-                swap_space.append(evicted_page)
-                frame_orders.append((list(frames), f" --> Miss (Removed -> {evicted_page})", list(swap_space), i + 1))
-            misses += 1
-
-    hit_ratio = hits / len(reference_string)
-    miss_ratio = misses / len(reference_string)
-    return hits, misses, hit_ratio, miss_ratio, frame_orders
-
-
-# Random Paging Algorithm
-def random_paging(reference_string, num_frames):
-    frames = []
-    hits = 0
-    misses = 0
-    swap_space = []
-    frame_orders = []
-
-    for i, page in enumerate(reference_string):
-        if page in frames:
-            hits += 1
-            frame_orders.append((list(frames), " --> Hit", list(swap_space), i + 1))
-        else:
-            if len(frames) < num_frames:
-                frames.append(page)
-                frame_orders.append((list(frames), " --> Miss (No change)", list(swap_space), i + 1))
-            else:
-                evicted_page = random.choice(frames)
-                frames.remove(evicted_page)
-                frames.append(page)
-                swap_space.append(evicted_page)
-                frame_orders.append((list(frames), f" --> Miss (Removed -> {evicted_page})", list(swap_space), i + 1))
-            misses += 1
+from bisect import bisect_left
+from tkinter import filedialog, font as tkfont, messagebox, ttk
 
-    hit_ratio = hits / len(reference_string)
-    miss_ratio = misses / len(reference_string)
-    return hits, misses, hit_ratio, miss_ratio, frame_orders
+from pagecontrol import ALGORITHMS, WORKLOADS, compare_algorithms as compare_policies, parse_reference_string
+from pagecontrol.policies import SimulationCancelled
+from pagecontrol.trace import STEP_EVICT, STEP_HIT, STEP_MISS
+from pagecontrol.cache import ResultCache, trace_fingerprint
+from pagecontrol.incremental import IncrementalSimulation
+from pagecontrol.address import TLB_POLICIES, addresses_to_pages, simulate_translation
+from pagecontrol.export import export_comparison, export_format, export_steps
+from pagecontrol.mrc import STACK_ALGORITHMS, miss_ratio_curve
+from pagecontrol.workloads import generate_workload, parse_mix
 
 
 # Function to calculate total pages
@@ -140,178 +28,778 @@ def calculate_total_pages():
         messagebox.showerror("Input Error", str(e))
 
 
+# Background job state - simulations run on a worker thread so the window stays responsive
+job_queue = queue.Queue()
+cancel_event = threading.Event()
+job_running = False
+
+
+# Function to run work(progress) on a worker thread and hand its result to on_done on the Tk thread
+def start_background_job(description, work, total, on_done):
+    global job_running
+    if job_running:
+        return
+    job_running = True
+    cancel_event.clear()
+
+    progress_bar.config(maximum=max(total, 1), value=0)
+    status_label.config(text=f"{description}...")
+    run_button.config(state=tk.DISABLED)
+    compare_button.config(state=tk.DISABLED)
+    curve_button.config(state=tk.DISABLED)
+    workload_button.config(state=tk.DISABLED)
+    cancel_button.config(state=tk.NORMAL)
+
+    def report_progress(done):
+        if cancel_event.is_set():
+            raise SimulationCancelled()
+        job_queue.put(("progress", done))
+
+    def worker():
+        try:
+            result = work(report_progress)
+        except SimulationCancelled:
+            job_queue.put(("cancelled", None))
+        except Exception as e:  # Reported to the user from the Tk thread
+            job_queue.put(("error", e))
+        else:
+            job_queue.put(("done", result))
+
+    threading.Thread(target=worker, daemon=True).start()
+    root.after(50, poll_background_job, on_done)
+
+
+# Function to poll the worker thread from the Tk event loop
+def poll_background_job(on_done):
+    global job_running
+    while True:
+        try:
+            kind, payload = job_queue.get_nowait()
+        except queue.Empty:
+            root.after(50, poll_background_job, on_done)
+            return
+
+        if kind == "progress":
+            progress_bar.config(value=payload)
+            continue
+
+        job_running = False
+        run_button.config(state=tk.NORMAL)
+        compare_button.config(state=tk.NORMAL)
+        curve_button.config(state=tk.NORMAL)
+        workload_button.config(state=tk.NORMAL)
+        cancel_button.config(state=tk.DISABLED)
+        if kind == "done":
+            progress_bar.config(value=progress_bar.cget("maximum"))
+            status_label.config(text="Done")
+            on_done(payload)
+        elif kind == "cancelled":
+            progress_bar.config(value=0)
+            status_label.config(text="Cancelled")
+        else:
+            progress_bar.config(value=0)
+            status_label.config(text="Failed")
+            messagebox.showerror("Simulation Error", str(payload))
+        return
+
+
+# Function to cancel the running simulation
+def cancel_simulation():
+    cancel_event.set()
+
+
+# Results of earlier runs, so re-running or re-comparing the same input doesn't simulate again
+result_cache = ResultCache()
+
+
+# Simulation of the last run, resumed when only references were appended to the reference string
+incremental_state = {"run": None}
+
+
+# Function to run a simulation that picks up where the last one stopped (runs on the worker thread)
+def run_incremental(simulation, reference_string, progress):
+    key = result_cache.key(trace_fingerprint(reference_string), simulation.algorithm, simulation.num_frames,
+                           simulation.seed)
+    # A run that would start over can use a cached trace instead, e.g. one recorded by Compare
+    if key is not None and (not len(simulation) or not simulation.extends(reference_string)):
+        result = result_cache.get(key, need_trace=True)
+        if result is not None:
+            result[4].build_checkpoints()
+            return result
+
+    result = simulation.update(reference_string, progress)
+    result[4].build_checkpoints()  # Here rather than on the first jump in the viewer
+    # The trace keeps growing with the simulation, so only the counts go in the shared cache
+    if key is not None:
+        result_cache.put(key, result[:4] + (None,))
+    return result
+
+
+# Synthetic workload shown in the reference entry as a placeholder - too long to type out
+generated_workload = {"label": None, "references": None}
+
+
+# Function to read the reference string: the generated workload while its placeholder is
+# still in the entry, otherwise the typed reference string
+def read_reference_string():
+    text = reference_entry.get()
+    if generated_workload["label"] is not None and text == generated_workload["label"]:
+        return generated_workload["references"]
+    return parse_reference_string(text)
+
+
+# Function to read the page numbers to simulate. In address mode the reference string holds
+# byte addresses, which are translated to pages and checked against the total memory.
+def read_page_numbers(total_memory, page_size):
+    reference_string = read_reference_string()
+    if reference_type_var.get() == "Byte Addresses":
+        return addresses_to_pages(reference_string, page_size, total_memory)
+    return reference_string
+
+
+# Function to open the synthetic workload dialog
+def open_workload_dialog():
+    dialog = tk.Toplevel(root)
+    dialog.title("Generate Workload")
+    dialog.configure(bg="#E8F4F8")
+    dialog.resizable(False, False)
+
+    fields = {}
+    for row, (label, default) in enumerate([
+        ("Length:", "100000"),
+        ("Pages:", "10000"),
+        ("Zipf Skew:", "1.0"),
+        ("Mix (zipf:0.7,scan:0.3):", "zipf:0.7,scan:0.3"),
+        ("Seed:", "0"),
+    ], start=1):
+        tk.Label(dialog, text=label, bg="#E8F4F8", fg="#2C3E50",
+                 font=("Arial", 10, "bold"), anchor="w").grid(row=row, column=0, sticky="w", padx=8, pady=3)
+        entry = ttk.Entry(dialog, width=22)
+        entry.insert(0, default)
+        entry.grid(row=row, column=1, padx=8, pady=3)
+        fields[label] = entry
+
+    tk.Label(dialog, text="Workload:", bg="#E8F4F8", fg="#2C3E50",
+             font=("Arial", 10, "bold"), anchor="w").grid(row=0, column=0, sticky="w", padx=8, pady=3)
+    workload_var = tk.StringVar(value="zipf")
+    ttk.Combobox(dialog, textvariable=workload_var, values=list(WORKLOADS),
+                 state="readonly", width=20).grid(row=0, column=1, padx=8, pady=3)
+
+    def generate():
+        try:
+            name = workload_var.get()
+            length = int(fields["Length:"].get())
+            seed = int(fields["Seed:"].get())
+            params = {}
+            if name in ("uniform", "zipf", "loop", "phases"):
+                params["pages"] = int(fields["Pages:"].get())
+                if params["pages"] <= 0:
+                    raise ValueError("Pages must be a positive integer.")
+            if name == "zipf":
+                params["skew"] = float(fields["Zipf Skew:"].get())
+            if name == "mix":
+                params["components"] = parse_mix(fields["Mix (zipf:0.7,scan:0.3):"].get())
+            if length <= 0:
+                raise ValueError("Length must be a positive integer.")
+        except ValueError as e:
+            messagebox.showerror("Input Error", str(e), parent=dialog)
+            return
+
+        dialog.destroy()
+        start_background_job(
+            f"Generating {name} workload",
+            lambda progress: generate_workload(name, length, seed=seed, **params),
+            1, lambda references: use_generated_workload(name, seed, references))
+
+    tk.Button(dialog, text="Generate", font=("Arial", 11, "bold"),
+              bg="#4682B4", fg="white", activebackground="#5DADE2", activeforeground="white",
+              command=generate).grid(row=6, column=0, columnspan=2, sticky="ew", padx=8, pady=8)
+
+
+# Function to put a generated workload in the reference entry
+def use_generated_workload(name, seed, references):
+    generated_workload["label"] = f"[{name} workload: {len(references)} references, seed {seed}]"
+    generated_workload["references"] = references
+    reference_entry.delete(0, tk.END)
+    reference_entry.insert(0, generated_workload["label"])
+
+
+# Function to read the Monte-Carlo replica count and the seed of randomized policies (blank: unseeded)
+def read_random_settings():
+    replicas = int(replicas_entry.get())
+    if replicas <= 0:
+        raise ValueError("Random replicas must be a positive integer.")
+    seed = seed_entry.get().strip()
+    return replicas, int(seed) if seed else None
+
+
 # Function to run the simulation
 def run_simulation():
     try:
         total_memory = int(memory_entry.get())
         page_size = int(page_size_entry.get())
         num_frames = int(frames_entry.get())
-        reference_string = list(map(int, reference_entry.get().split()))
         algo_choice = algorithm_var.get()
+        _, seed = read_random_settings()
 
         if total_memory <= 0 or page_size <= 0 or num_frames <= 0:
             raise ValueError("Memory, page size, and frames must be positive integers.")
+        reference_string = read_page_numbers(total_memory, page_size)
 
-        if algo_choice == "FIFO":
-            hits, misses, hit_ratio, miss_ratio, frame_orders = fifo_paging(reference_string, num_frames)
-        elif algo_choice == "LRU":
-            hits, misses, hit_ratio, miss_ratio, frame_orders = lru_paging(reference_string, num_frames)
-        elif algo_choice == "Optimal (OPT)":
-            hits, misses, hit_ratio, miss_ratio, frame_orders = optimal_paging(reference_string, num_frames)
-        elif algo_choice == "Random (RAND)":
-            hits, misses, hit_ratio, miss_ratio, frame_orders = random_paging(reference_string, num_frames)
-        else:
+        if algo_choice not in ALGORITHMS:
             messagebox.showerror("Error", "Please select a valid paging algorithm.")
             return
 
-        results_text.config(state=tk.NORMAL)
-        results_text.delete("1.0", tk.END)
-        results_text.insert(tk.END, f"Page Faults: {misses}\n", "fault")
-        results_text.insert(tk.END, f"Hits: {hits}\n", "hit")
-        results_text.insert(tk.END, f"Hit Ratio: {hit_ratio:.2f}\n", "ratio")
-        results_text.insert(tk.END, f"Miss Ratio: {miss_ratio:.2f}\n\n", "ratio")
-
-        results_text.insert(tk.END, "Step-by-Step Frame State:\n", "header")
-        results_text.config(state=tk.DISABLED)
+        if reference_type_var.get() == "Byte Addresses":
+            tlb_entries = int(tlb_entries_entry.get())
+            tlb_ways = int(tlb_ways_entry.get())
+            tlb_policy = tlb_policy_var.get()
 
-        # Function to update the results text with a delay
-        def update_results(index):
-            if index < len(frame_orders):
-                frames, status, swap, step = frame_orders[index]
-                results_text.config(state=tk.NORMAL)
+            def run_translation(progress):
+                result = simulate_translation(reference_string, algo_choice, num_frames, tlb_entries, tlb_ways,
+                                              tlb_policy, progress=progress, seed=seed)
+                result["trace"].build_checkpoints()
+                return result
 
-                # Different colors for hits and misses
-                tag = "hit_text" if "Hit" in status else "miss_text"
-                results_text.insert(tk.END, f"Step {step}: {frames} ", "step")
-                results_text.insert(tk.END, f"{status}\n", tag)
-                results_text.insert(tk.END, f"Swap Space: {swap}\n\n", "swap")
+            start_background_job(f"Running {algo_choice} with a TLB", run_translation, len(reference_string),
+                                 show_translation_results)
+            return
 
-                results_text.config(state=tk.DISABLED)
-                results_text.see(tk.END)  # Scroll to the end
-                root.after(300, update_results, index + 1)  # Schedule the next update after 300ms
+        simulation = incremental_state["run"]
+        if (simulation is None or simulation.algorithm != algo_choice or simulation.num_frames != num_frames
+                or simulation.seed != seed):
+            simulation = IncrementalSimulation(algo_choice, num_frames, seed=seed)
+            incremental_state["run"] = simulation
 
-        # Start the delayed updates
-        update_results(0)
+        # The viewer may be showing this simulation's trace, which the worker is about to extend
+        stop_playback()
+        viewer_state["result"] = None
+        start_background_job(
+            f"Running {algo_choice}",
+            lambda progress: run_incremental(simulation, reference_string, progress),
+            len(reference_string), show_simulation_results)
 
     except ValueError as e:
         messagebox.showerror("Input Error", str(e))
 
 
+# Function to display the results of an address-mode simulation, with its TLB statistics
+def show_translation_results(result):
+    show_simulation_results(
+        (result["hits"], result["misses"], result["hit_ratio"], result["miss_ratio"], result["trace"]), result)
+
+
+# Function to display the results of a finished simulation in the step viewer
+def show_simulation_results(result, translation=None):
+    stop_playback()
+    viewer_state["result"] = result
+    viewer_state["translation"] = translation
+    viewer_state["position"] = 0
+    viewer_state["top"] = 0
+    apply_step_filter()
+    start_playback()
+
+
+# Step viewer - renders only the visible window of steps from the stored StepTrace
+PLAYBACK_SPEEDS = {
+    "1 step/s": 1,
+    "3 steps/s": 3,
+    "10 steps/s": 10,
+    "30 steps/s": 30,
+    "100 steps/s": 100,
+    "1000 steps/s": 1000,
+    "10000 steps/s": 10000,
+    "Instant": None,
+}
+STEP_FILTERS = {
+    "All Steps": None,
+    "Misses Only": (STEP_MISS, STEP_EVICT),
+    "Evictions Only": (STEP_EVICT,),
+    "Hits Only": (STEP_HIT,),
+}
+SWAP_PREVIEW = 10  # Most recent swapped-out pages shown per step
+SUMMARY_LINES = 7  # Lines above the first step row
+TRANSLATION_LINES = 3  # Extra summary lines of an address-mode run
+
+viewer_state = {
+    "result": None,
+    "translation": None,  # TLB statistics of an address-mode run
+    "steps": range(0),  # Trace indices that pass the filter
+    "position": 0,  # Current step, as a position in "steps"
+    "top": 0,  # First visible position
+    "playing": False,
+    "after_id": None,
+}
+
+
+# Number of steps that fit in the results area (three lines per step)
+def visible_step_count():
+    summary_lines = SUMMARY_LINES + (TRANSLATION_LINES if viewer_state["translation"] else 0)
+    return max(1, (results_text.winfo_height() // step_line_height - summary_lines) // 3)
+
+
+# Function to redraw the summary and the visible window of steps
+def render_steps():
+    result = viewer_state["result"]
+    if result is None:
+        return
+    hits, misses, hit_ratio, miss_ratio, trace = result
+    steps = viewer_state["steps"]
+    top = viewer_state["top"]
+    bottom = min(top + visible_step_count(), len(steps))
+
+    results_text.config(state=tk.NORMAL)
+    results_text.delete("1.0", tk.END)
+    results_text.insert(tk.END, f"Page Faults: {misses}\n", "fault")
+    results_text.insert(tk.END, f"Hits: {hits}\n", "hit")
+    results_text.insert(tk.END, f"Hit Ratio: {hit_ratio:.2f}\n", "ratio")
+    results_text.insert(tk.END, f"Miss Ratio: {miss_ratio:.2f}\n", "ratio")
+    translation = viewer_state["translation"]
+    if translation:
+        results_text.insert(tk.END, f"TLB Hit Rate: {translation['tlb_hit_rate']:.2f} "
+                                    f"({translation['tlb_hits']} of {translation['references']})\n", "ratio")
+        results_text.insert(tk.END, f"Page Fault Rate: {translation['page_fault_rate']:.4f}\n", "ratio")
+        results_text.insert(tk.END, f"Effective Access Time: {translation['effective_access_time']:.1f} ns\n",
+                            "ratio")
+    results_text.insert(tk.END, "\n")
+
+    if steps:
+        header = f"Step-by-Step Frame State ({filter_var.get()}: {top + 1}-{bottom} of {len(steps)}):\n"
+    else:
+        header = f"Step-by-Step Frame State ({filter_var.get()}: no matching steps):\n"
+    results_text.insert(tk.END, header, "header")
+
+    indices = [steps[position] for position in range(top, bottom)]
+    for position, index, frames in zip(range(top, bottom), indices, trace.iter_frames(indices)):
+        status = trace.status_text(index)
+        swap_count = trace.swap_count_at(index)
+        swap = trace.swap_tail_at(index, SWAP_PREVIEW)
+        if swap_count > SWAP_PREVIEW:
+            swap_text = "[..., " + ", ".join(map(str, swap)) + "]"
+        else:
+            swap_text = str(swap)
+
+        # Different colors for hits and misses, and a highlight on the current step
+        tag = "hit_text" if "Hit" in status else "miss_text"
+        row_start = results_text.index(tk.END + "-1c")
+        results_text.insert(tk.END, f"Step {index + 1}: {frames} ", "step")
+        results_text.insert(tk.END, f"{status}\n", tag)
+        results_text.insert(tk.END, f"Swap Space ({swap_count}): {swap_text}\n\n", "swap")
+        if position == viewer_state["position"]:
+            results_text.tag_add("current", row_start, results_text.index(tk.END + "-2c"))
+
+    results_text.config(state=tk.DISABLED)
+    if steps:
+        scrollbar.set(top / len(steps), bottom / len(steps))
+    else:
+        scrollbar.set(0, 1)
+
+
+# Function to move the current step, scrolling it into view
+def set_step_position(position):
+    steps = viewer_state["steps"]
+    position = max(0, min(position, len(steps) - 1))
+    viewer_state["position"] = position
+    rows = visible_step_count()
+    if position < viewer_state["top"]:
+        viewer_state["top"] = position
+    elif position >= viewer_state["top"] + rows:
+        viewer_state["top"] = position - rows + 1
+    step_scale.set(position + 1)
+    render_steps()
+
+
+# Function to rebuild the list of visible steps when the filter changes
+def apply_step_filter(*args):
+    result = viewer_state["result"]
+    if result is None:
+        return
+    trace = result[4]
+    codes = STEP_FILTERS[filter_var.get()]
+
+    # Stay on (or just after) the step that was current before filtering
+    steps = viewer_state["steps"]
+    current = steps[viewer_state["position"]] if steps else 0
+    steps = range(len(trace)) if codes is None else trace.find_steps(codes)
+    viewer_state["steps"] = steps
+    viewer_state["top"] = 0
+    step_scale.config(to=max(1, len(steps)))
+    set_step_position(bisect_left(steps, current))
+
+
+# Scrollbar command - moves the visible window without changing the current step
+def scroll_steps(action, amount, unit=None):
+    steps = viewer_state["steps"]
+    rows = visible_step_count()
+    if action == "moveto":
+        top = int(float(amount) * len(steps))
+    elif unit == "pages":
+        top = viewer_state["top"] + int(amount) * rows
+    else:
+        top = viewer_state["top"] + int(amount)
+    viewer_state["top"] = max(0, min(top, len(steps) - rows))
+    render_steps()
+
+
+# Scrubber command
+def scrub_steps(value):
+    position = int(float(value)) - 1
+    if position != viewer_state["position"]:
+        set_step_position(position)
+
+
+# Function to jump to the step number typed in the Step box
+def jump_to_step(*args):
+    try:
+        step = int(jump_entry.get())
+    except ValueError:
+        messagebox.showerror("Input Error", "Step must be an integer.")
+        return
+    set_step_position(bisect_left(viewer_state["steps"], step - 1))
+
+
+def start_playback():
+    if viewer_state["result"] is None or viewer_state["playing"]:
+        return
+    viewer_state["playing"] = True
+    play_button.config(text="Pause")
+    playback_tick()
+
+
+def stop_playback():
+    viewer_state["playing"] = False
+    if viewer_state["after_id"] is not None:
+        root.after_cancel(viewer_state["after_id"])
+        viewer_state["after_id"] = None
+    play_button.config(text="Play")
+
+
+def toggle_playback():
+    if viewer_state["playing"]:
+        stop_playback()
+        return
+    # Playing from the last step starts over
+    if viewer_state["position"] >= len(viewer_state["steps"]) - 1:
+        set_step_position(0)
+    start_playback()
+
+
+# Function to advance playback at the selected speed
+def playback_tick():
+    viewer_state["after_id"] = None
+    last = len(viewer_state["steps"]) - 1
+    speed = PLAYBACK_SPEEDS[speed_var.get()]
+    if speed is None:
+        set_step_position(last)
+        stop_playback()
+        return
+    if viewer_state["position"] >= last:
+        stop_playback()
+        return
+
+    # Faster than one step per redraw: skip ahead several steps per tick
+    delay = max(30, 1000 // speed)
+    advance = max(1, speed * delay // 1000)
+    viewer_state["after_id"] = root.after(delay, advance_playback, advance)
+
+
+def advance_playback(advance):
+    set_step_position(viewer_state["position"] + advance)
+    playback_tick()
+
+
 # Function to compare all algorithms
 def compare_algorithms():
     try:
         total_memory = int(memory_entry.get())
         page_size = int(page_size_entry.get())
         num_frames = int(frames_entry.get())
-        reference_string = list(map(int, reference_entry.get().split()))
         criteria = criteria_var.get()
+        replicas, seed = read_random_settings()
 
         if total_memory <= 0 or page_size <= 0 or num_frames <= 0:
             raise ValueError("Memory, page size, and frames must be positive integers.")
+        reference_string = read_page_numbers(total_memory, page_size)
+
+        # Stats of the instrumented runs by algorithm, filled in on the worker thread
+        if performance_var.get():
+            performance = {}
+
+            def on_stats(stats):
+                performance[stats["algorithm"]] = stats
+        else:
+            performance = None
+            on_stats = None
+        # Keep the step traces when they all fit in the cache, so Run can show one without simulating again
+        record_trace = len(ALGORITHMS) * len(reference_string) <= result_cache.max_steps
+        start_background_job(
+            "Comparing algorithms",
+            lambda progress: compare_policies(reference_string, num_frames, criteria, progress=progress,
+                                              cache=result_cache, replicas=replicas, seed=seed, on_stats=on_stats,
+                                              record_trace=record_trace),
+            len(ALGORITHMS) * len(reference_string), lambda comparison: show_comparison(comparison, performance))
+
+    except ValueError as e:
+        messagebox.showerror("Input Error", str(e))
+
+
+# File types offered when exporting step events or a comparison table
+EXPORT_FILETYPES = [("CSV", "*.csv"), ("NumPy archive", "*.npz"), ("Parquet", "*.parquet")]
+
+
+# Function to ask for an export file; returns None when the dialog is cancelled
+def ask_export_path(title):
+    path = filedialog.asksaveasfilename(title=title, defaultextension=".csv", filetypes=EXPORT_FILETYPES)
+    if not path:
+        return None
+    export_format(path)  # Raises ValueError for an unsupported extension
+    return path
+
+
+# Function to export the step events of the run shown in the viewer
+def export_step_events():
+    result = viewer_state["result"]
+    if result is None or result[4] is None:
+        messagebox.showerror("Export Error", "Run a simulation first.")
+        return
+    try:
+        path = ask_export_path("Export Step Events")
+    except ValueError as e:
+        messagebox.showerror("Export Error", str(e))
+        return
+    if path is None:
+        return
+
+    trace = result[4]
+    start_background_job(
+        "Exporting steps",
+        lambda progress: export_steps(trace, path, progress=progress),
+        len(trace), lambda _: status_label.config(text=f"Exported {len(trace)} steps"))
+
+
+# Function to export the table of a comparison window
+def export_comparison_table(comparison):
+    try:
+        path = ask_export_path("Export Comparison")
+        if path is not None:
+            export_comparison(comparison, path)
+    except (OSError, ValueError) as e:
+        messagebox.showerror("Export Error", str(e))
+
+
+# Function to display the comparison of all algorithms in a new window
+def show_comparison(comparison, performance=None):
+    results, best_algorithm, best_metric, metric_name, spread = comparison
+
+    # Display results in a new window
+    comparison_window = tk.Toplevel(root)
+    comparison_window.title("Algorithm Comparison")
+    # Room for every registered policy, and for the spread and Performance columns
+    columns = 5 + (2 if spread else 0) + (4 if performance else 0)
+    comparison_window.geometry(f"{120 * columns}x{300 + 36 * len(results)}")
+    comparison_window.configure(bg="#F5F5F5")  # Light background for comparison window
+
+    # Title for comparison window
+    title_frame = tk.Frame(comparison_window, bg="#3A7CA5")  # Changed to a nicer blue
+    title_frame.pack(fill="x", pady=0)
+    title_label = tk.Label(title_frame, text="Algorithm Performance Comparison",
+                           font=("Arial", 14, "bold"), bg="#3A7CA5", fg="white", pady=10)
+    title_label.pack()
+
+    # Create a table to display the results (using a centered layout)
+    main_comparison_frame = tk.Frame(comparison_window, bg="#F5F5F5")
+    main_comparison_frame.pack(fill="both", expand=True, padx=20, pady=20)
+
+    # Center the table horizontally
+    center_frame = tk.Frame(main_comparison_frame, bg="#F5F5F5")
+    center_frame.place(relx=0.5, rely=0.4, anchor="center")
+
+    table_frame = tk.Frame(center_frame, bg="#F5F5F5")
+    table_frame.pack()
+
+    # Table headers with better colors
+    headers = ["Algorithm", "Hits", "Misses", "Hit Ratio", "Miss Ratio"]
+    header_colors = ["#2E86C1", "#3498DB", "#2874A6", "#21618C", "#1B4F72"]  # Nicer blue gradient
+    if spread:
+        headers += ["Hit Ratio SD", "95% CI"]
+        header_colors += ["#154360", "#0E2F44"]
+    if performance:
+        headers += ["Time (s)", "Refs/s", "Evictions", "Victim Time"]
+        header_colors += ["#7D3C98", "#6C3483", "#5B2C6F", "#4A235A"]  # Performance columns in purple
+
+    for col, header in enumerate(headers):
+        label = tk.Label(table_frame, text=header, bg=header_colors[col], fg="white",
+                         font=("Arial", 12, "bold"), padx=10, pady=5, width=12)
+        label.grid(row=0, column=col, sticky="ew")
+
+    # Table rows with improved algorithm-specific colors
+    algo_colors = {
+        "FIFO": "#AED6F1",  # Lighter blue
+        "LRU": "#A3E4D7",  # Lighter teal
+        "Optimal (OPT)": "#F9E79F",  # Lighter yellow
+        "Random (RAND)": "#D7BDE2",  # Lighter purple
+        "CLOCK": "#FAD7A0",  # Lighter orange
+        "LFU": "#F5B7B1",  # Lighter red
+        "ARC": "#ABEBC6",  # Lighter green
+        "2Q": "#D6EAF8",  # Pale blue
+        "LIRS": "#E8DAEF"  # Pale purple
+    }
+
+    for row, result in enumerate(results, start=1):
+        algo_name = result[0]
+        row_color = algo_colors.get(algo_name, "#E5E8E8")  # Light gray for newly registered policies
+        if spread:
+            # Mean over the replicas for randomized policies, exact counts for the others
+            estimate = spread.get(algo_name)
+            if estimate is None:
+                result = result + ("-", "-")
+            else:
+                low, high = estimate["hit_ratio_ci"]
+                result = (algo_name, f"{result[1]:.1f}", f"{result[2]:.1f}", result[3], result[4],
+                          f"{estimate['hit_ratio_stddev']:.4f}", f"{low:.3f}-{high:.3f}")
+        if performance:
+            # Monte-Carlo batches aren't instrumented
+            stats = performance.get(algo_name)
+            if stats is None:
+                result = result + ("-", "-", "-", "-")
+            else:
+                result = result + (f"{stats['seconds']:.3f}", f"{stats['refs_per_sec']:,.0f}", stats["evictions"],
+                                   f"{stats['victim_share']:.0%}")
+
+        for col, value in enumerate(result):
+            text_color = "black"  # Better contrast on light backgrounds
+            if col == 0:  # Algorithm name column
+                font_style = ("Arial", 11, "bold")
+                display_value = value  # Use the full algorithm name
+            elif col == 3 or col == 4:  # Hit or Miss ratio - format to 2 decimal places
+                font_style = ("Arial", 11)
+                display_value = f"{value:.2f}"  # Format to 2 decimal places
+            else:
+                font_style = ("Arial", 11)
+                display_value = value
+
+            label = tk.Label(table_frame, text=display_value, bg=row_color, fg=text_color,
+                             font=font_style, padx=10, pady=5, width=12)
+            label.grid(row=row, column=col, sticky="ew")
+
+    # Display the best algorithm
+    result_frame = tk.Frame(comparison_window, bg="#F5F5F5")
+    result_frame.place(relx=0.5, rely=0.8, anchor="center")
+
+    best_text = f"Best Algorithm: {best_algorithm[0]}"
+    if best_algorithm[0] in spread:
+        best_text += f" (mean of {spread[best_algorithm[0]]['replicas']} replicas)"
+    best_label = tk.Label(result_frame,
+                          text=best_text,
+                          font=("Arial", 12, "bold"), fg="#2471A3", bg="#F5F5F5")
+    best_label.pack()
+
+    metric_label = tk.Label(result_frame,
+                            text=f"{metric_name}: {best_metric:.2f}",
+                            font=("Arial", 11), fg="#2471A3", bg="#F5F5F5")
+    metric_label.pack()
+
+    export_table_button = tk.Button(result_frame, text="Export Table", font=("Arial", 10, "bold"),
+                                    bg="#3A7CA5", fg="white", activebackground="#5DADE2", activeforeground="white",
+                                    command=lambda: export_comparison_table(comparison))
+    export_table_button.pack(pady=(8, 0))
+
+
+# Function to plot the miss ratio curves of the stack algorithms
+def show_miss_ratio_curve():
+    try:
+        num_frames = int(frames_entry.get())
 
-        algorithms = ["FIFO", "LRU", "Optimal (OPT)", "Random (RAND)"]
-        results = []
-
-        for algo in algorithms:
-            if algo == "FIFO":
-                hits, misses, hit_ratio, miss_ratio, _ = fifo_paging(reference_string, num_frames)
-            elif algo == "LRU":
-                hits, misses, hit_ratio, miss_ratio, _ = lru_paging(reference_string, num_frames)
-            elif algo == "Optimal (OPT)":
-                hits, misses, hit_ratio, miss_ratio, _ = optimal_paging(reference_string, num_frames)
-            elif algo == "Random (RAND)":
-                hits, misses, hit_ratio, miss_ratio, _ = random_paging(reference_string, num_frames)
-            results.append((algo, hits, misses, hit_ratio, miss_ratio))
-
-        # Determine the best algorithm based on the selected criteria
-        if criteria == "Hit Ratio":
-            best_algorithm = max(results, key=lambda x: x[3])  # x[3] is the hit ratio
-            best_metric = best_algorithm[3]
-            metric_name = "Hit Ratio"
+        if num_frames <= 0:
+            raise ValueError("Frames must be a positive integer.")
+        if reference_type_var.get() == "Byte Addresses":
+            reference_string = read_page_numbers(int(memory_entry.get()), int(page_size_entry.get()))
         else:
-            best_algorithm = min(results, key=lambda x: x[4])  # x[4] is the miss ratio
-            best_metric = best_algorithm[4]
-            metric_name = "Miss Ratio"
-
-        # Display results in a new window
-        comparison_window = tk.Toplevel(root)
-        comparison_window.title("Algorithm Comparison")
-        comparison_window.geometry("600x450")
-        comparison_window.configure(bg="#F5F5F5")  # Light background for comparison window
-
-        # Title for comparison window
-        title_frame = tk.Frame(comparison_window, bg="#3A7CA5")  # Changed to a nicer blue
-        title_frame.pack(fill="x", pady=0)
-        title_label = tk.Label(title_frame, text="Algorithm Performance Comparison",
-                               font=("Arial", 14, "bold"), bg="#3A7CA5", fg="white", pady=10)
-        title_label.pack()
-
-        # Create a table to display the results (using a centered layout)
-        main_comparison_frame = tk.Frame(comparison_window, bg="#F5F5F5")
-        main_comparison_frame.pack(fill="both", expand=True, padx=20, pady=20)
-
-        # Center the table horizontally
-        center_frame = tk.Frame(main_comparison_frame, bg="#F5F5F5")
-        center_frame.place(relx=0.5, rely=0.4, anchor="center")
-
-        table_frame = tk.Frame(center_frame, bg="#F5F5F5")
-        table_frame.pack()
-
-        # Table headers with better colors
-        headers = ["Algorithm", "Hits", "Misses", "Hit Ratio", "Miss Ratio"]
-        header_colors = ["#2E86C1", "#3498DB", "#2874A6", "#21618C", "#1B4F72"]  # Nicer blue gradient
-
-        for col, header in enumerate(headers):
-            label = tk.Label(table_frame, text=header, bg=header_colors[col], fg="white",
-                             font=("Arial", 12, "bold"), padx=10, pady=5, width=12)
-            label.grid(row=0, column=col, sticky="ew")
-
-        # Table rows with improved algorithm-specific colors
-        algo_colors = {
-            "FIFO": "#AED6F1",  # Lighter blue
-            "LRU": "#A3E4D7",  # Lighter teal
-            "Optimal (OPT)": "#F9E79F",  # Lighter yellow
-            "Random (RAND)": "#D7BDE2"  # Lighter purple
-        }
-
-        for row, result in enumerate(results, start=1):
-            algo_name = result[0]
-            row_color = algo_colors[algo_name]
-
-            for col, value in enumerate(result):
-                text_color = "black"  # Better contrast on light backgrounds
-                if col == 0:  # Algorithm name column
-                    font_style = ("Arial", 11, "bold")
-                    display_value = value  # Use the full algorithm name
-                elif col == 3 or col == 4:  # Hit or Miss ratio - format to 2 decimal places
-                    font_style = ("Arial", 11)
-                    display_value = f"{value:.2f}"  # Format to 2 decimal places
-                else:
-                    font_style = ("Arial", 11)
-                    display_value = value
-
-                label = tk.Label(table_frame, text=display_value, bg=row_color, fg=text_color,
-                                 font=font_style, padx=10, pady=5, width=12)
-                label.grid(row=row, column=col, sticky="ew")
-
-        # Display the best algorithm
-        result_frame = tk.Frame(comparison_window, bg="#F5F5F5")
-        result_frame.place(relx=0.5, rely=0.8, anchor="center")
-
-        best_label = tk.Label(result_frame,
-                              text=f"Best Algorithm: {best_algorithm[0]}",
-                              font=("Arial", 12, "bold"), fg="#2471A3", bg="#F5F5F5")
-        best_label.pack()
-
-        metric_label = tk.Label(result_frame,
-                                text=f"{metric_name}: {best_metric:.2f}",
-                                font=("Arial", 11), fg="#2471A3", bg="#F5F5F5")
-        metric_label.pack()
+            reference_string = read_reference_string()
+
+        total = len(reference_string)
+
+        # Runs on the worker thread, since counting the distinct pages of a long trace takes a while
+        def compute_curves(progress):
+            # Past the number of distinct pages every curve is flat at the compulsory misses. The curve stops
+            # at twice the entered frame count, since the OPT pass slows down with every level it tracks.
+            max_frames = max(num_frames, min(len(set(reference_string)), 2 * num_frames))
+            curves = {}
+            for index, algo in enumerate(STACK_ALGORITHMS):
+                curves[algo] = miss_ratio_curve(reference_string, max_frames, algo,
+                                                lambda done, offset=index * total: progress(offset + done))
+            return curves, max_frames
+
+        start_background_job("Computing miss ratio curves", compute_curves, len(STACK_ALGORITHMS) * total,
+                             lambda result: draw_miss_ratio_curve(result[0], num_frames, result[1]))
 
     except ValueError as e:
         messagebox.showerror("Input Error", str(e))
 
 
+# Function to draw miss ratio curves in a new window
+def draw_miss_ratio_curve(curves, num_frames, max_frames):
+    curve_window = tk.Toplevel(root)
+    curve_window.title("Miss Ratio Curve")
+    curve_window.geometry("700x500")
+    curve_window.configure(bg="#F5F5F5")
+
+    title_frame = tk.Frame(curve_window, bg="#3A7CA5")
+    title_frame.pack(fill="x", pady=0)
+    title_label = tk.Label(title_frame, text="Miss Ratio vs. Number of Frames",
+                           font=("Arial", 14, "bold"), bg="#3A7CA5", fg="white", pady=10)
+    title_label.pack()
+
+    width, height = 660, 400
+    left, right, top, bottom = 60, 20, 20, 50
+    canvas = tk.Canvas(curve_window, width=width, height=height, bg="#FFFFFF", highlightthickness=0)
+    canvas.pack(padx=20, pady=15)
+
+    def x_pos(frames):
+        if max_frames == 1:
+            return left
+        return left + (frames - 1) * (width - left - right) / (max_frames - 1)
+
+    def y_pos(ratio):
+        return top + (1 - ratio) * (height - top - bottom)
+
+    # Axes, grid and labels
+    canvas.create_line(left, top, left, height - bottom, fill="#2C3E50", width=2)
+    canvas.create_line(left, height - bottom, width - right, height - bottom, fill="#2C3E50", width=2)
+    for tick in range(0, 11, 2):
+        ratio = tick / 10
+        canvas.create_line(left, y_pos(ratio), width - right, y_pos(ratio), fill="#E5E8E8")
+        canvas.create_text(left - 8, y_pos(ratio), text=f"{ratio:.1f}", anchor="e", font=("Arial", 9))
+    x_step = max(1, max_frames // 10)
+    for frames in range(1, max_frames + 1, x_step):
+        canvas.create_text(x_pos(frames), height - bottom + 12, text=str(frames), font=("Arial", 9))
+    canvas.create_text((left + width - right) / 2, height - 15, text="Number of Frames",
+                       font=("Arial", 10, "bold"), fill="#2C3E50")
+    canvas.create_text(15, (top + height - bottom) / 2, text="Miss Ratio", angle=90,
+                       font=("Arial", 10, "bold"), fill="#2C3E50")
+
+    # Mark the frame count currently entered
+    canvas.create_line(x_pos(num_frames), top, x_pos(num_frames), height - bottom,
+                       fill="#95A5A6", dash=(4, 3))
+
+    curve_colors = {"LRU": "#16A085", "Optimal (OPT)": "#D4AC0D"}
+    for index, (algo, curve) in enumerate(curves.items()):
+        points = []
+        for frames, _, _, _, miss_ratio in curve:
+            points.extend((x_pos(frames), y_pos(miss_ratio)))
+        if len(points) > 2:
+            canvas.create_line(*points, fill=curve_colors[algo], width=2)
+        else:
+            canvas.create_oval(points[0] - 3, points[1] - 3, points[0] + 3, points[1] + 3,
+                               fill=curve_colors[algo], outline="")
+
+        # Legend
+        legend_y = top + 10 + index * 18
+        canvas.create_line(width - right - 140, legend_y, width - right - 115, legend_y,
+                           fill=curve_colors[algo], width=3)
+        canvas.create_text(width - right - 110, legend_y, text=algo, anchor="w", font=("Arial", 10, "bold"))
+
+
 # GUI Setup
 root = tk.Tk()
 root.title("PageControl - Memory Management Simulator")
@@ -358,7 +846,10 @@ input_sections = [
         "Total Memory (bytes):", "Page Size (bytes):", "Number of Frames:", "CPU Reference String:"
     ]},
     {"label": "Algorithm Settings", "color": "#1ABC9C", "fields": [  # Changed color to a more vibrant teal
-        "Select Algorithm:", "Comparison Criteria:"
+        "Select Algorithm:", "Comparison Criteria:", "Random Replicas / Seed:"
+    ]},
+    {"label": "Address Translation", "color": "#3A7CA5", "fields": [
+        "Reference Type:", "TLB Entries / Ways / Replacement:"
     ]}
 ]
 
@@ -386,7 +877,7 @@ for section in input_sections:
         if field == "Select Algorithm:":
             algorithm_var = tk.StringVar()
             dropdown = ttk.Combobox(field_frame, textvariable=algorithm_var,
-                                    values=["FIFO", "LRU", "Optimal (OPT)", "Random (RAND)"],
+                                    values=list(ALGORITHMS),
                                     state="readonly")
             dropdown.current(0)
             dropdown.pack(fill="x", padx=5, pady=3)
@@ -395,7 +886,32 @@ for section in input_sections:
             dropdown = ttk.Combobox(field_frame, textvariable=criteria_var,
                                     values=["Hit Ratio", "Miss Ratio"],
                                     state="readonly")
+            dropdown.pack(side="left", fill="x", expand=True, padx=5, pady=3)
+            # Instrument the comparison runs and show the Performance columns
+            performance_var = tk.BooleanVar(value=False)
+            performance_check = tk.Checkbutton(field_frame, text="Performance", variable=performance_var,
+                                               bg="#E8F4F8", fg="#2C3E50", font=("Arial", 9))
+            performance_check.pack(side="left", padx=5)
+        elif field == "Random Replicas / Seed:":
+            replicas_entry = ttk.Entry(field_frame, width=8)
+            replicas_entry.pack(side="left", padx=5, pady=3)
+            seed_entry = ttk.Entry(field_frame, width=8)
+            seed_entry.pack(side="left", padx=5, pady=3)
+        elif field == "Reference Type:":
+            reference_type_var = tk.StringVar(value="Page Numbers")
+            dropdown = ttk.Combobox(field_frame, textvariable=reference_type_var,
+                                    values=["Page Numbers", "Byte Addresses"],
+                                    state="readonly")
             dropdown.pack(fill="x", padx=5, pady=3)
+        elif field == "TLB Entries / Ways / Replacement:":
+            tlb_entries_entry = ttk.Entry(field_frame, width=8)
+            tlb_entries_entry.pack(side="left", padx=5, pady=3)
+            tlb_ways_entry = ttk.Entry(field_frame, width=8)
+            tlb_ways_entry.pack(side="left", padx=5, pady=3)
+            tlb_policy_var = tk.StringVar(value="LRU")
+            dropdown = ttk.Combobox(field_frame, textvariable=tlb_policy_var, values=TLB_POLICIES,
+                                    state="readonly", width=10)
+            dropdown.pack(side="left", fill="x", expand=True, padx=5, pady=3)
         else:
             # Custom styled Entry fields for numbers
             if "Memory" in field or "Size" in field or "Frames" in field:
@@ -424,6 +940,13 @@ total_pages_label.pack(fill="x", padx=5)
 button_frame = tk.Frame(input_frame, bg="#E8F4F8")
 button_frame.pack(fill="x", pady=15, side="bottom")
 
+# Progress of the running simulation
+progress_bar = ttk.Progressbar(button_frame, orient="horizontal", mode="determinate")
+progress_bar.pack(fill="x", padx=8, pady=(0, 4))
+
+status_label = tk.Label(button_frame, text="Ready", bg="#E8F4F8", fg="#2C3E50", font=("Arial", 10))
+status_label.pack(fill="x", padx=8)
+
 # Run Simulation Button - Made more obvious as a button
 run_button = tk.Button(button_frame, text="Run Simulation", font=("Arial", 12, "bold"),
                        bg="#4682B4", fg="white", padx=12, pady=10,
@@ -440,20 +963,91 @@ compare_button = tk.Button(button_frame, text="Compare Algorithms", font=("Arial
                            command=compare_algorithms)
 compare_button.pack(fill="x", padx=8, pady=8)
 
+# Cancel Button - Only enabled while a simulation is running
+cancel_button = tk.Button(button_frame, text="Cancel", font=("Arial", 12, "bold"),
+                          bg="#E74C3C", fg="white", padx=12, pady=10,
+                          activebackground="#EC7063", activeforeground="white",
+                          relief="raised", bd=2, state=tk.DISABLED,
+                          command=cancel_simulation)
+cancel_button.pack(fill="x", padx=8, pady=8)
+
+# Miss Ratio Curve Button
+curve_button = tk.Button(button_frame, text="Miss Ratio Curve", font=("Arial", 12, "bold"),
+                         bg="#3A7CA5", fg="white", padx=12, pady=10,
+                         activebackground="#5DADE2", activeforeground="white",
+                         relief="raised", bd=2,
+                         command=show_miss_ratio_curve)
+curve_button.pack(fill="x", padx=8, pady=8)
+
+# Generate Workload Button - fills the reference string with a synthetic workload
+workload_button = tk.Button(button_frame, text="Generate Workload", font=("Arial", 12, "bold"),
+                            bg="#8E44AD", fg="white", padx=12, pady=10,
+                            activebackground="#A569BD", activeforeground="white",
+                            relief="raised", bd=2,
+                            command=open_workload_dialog)
+workload_button.pack(fill="x", padx=8, pady=8)
+
 # Results Header
 results_header = tk.Label(output_frame, text="Simulation Results", bg="#5DADE2",
                           fg="white", font=("Arial", 14, "bold"), pady=10)  # Increased font size
 results_header.pack(fill="x")
 
+# Step Viewer Controls - playback, speed, filter and jump-to-step
+viewer_controls = tk.Frame(output_frame, bg="#E8F4F8")
+viewer_controls.pack(fill="x", padx=8, pady=(8, 0))
+
+play_button = tk.Button(viewer_controls, text="Play", font=("Arial", 10, "bold"),
+                        bg="#4682B4", fg="white", activebackground="#5DADE2", activeforeground="white",
+                        width=7, command=toggle_playback)
+play_button.pack(side="left", padx=(0, 8))
+
+tk.Label(viewer_controls, text="Speed:", bg="#E8F4F8", fg="#2C3E50",
+         font=("Arial", 10, "bold")).pack(side="left")
+speed_var = tk.StringVar(value="3 steps/s")
+speed_dropdown = ttk.Combobox(viewer_controls, textvariable=speed_var, values=list(PLAYBACK_SPEEDS),
+                              state="readonly", width=12)
+speed_dropdown.pack(side="left", padx=(2, 8))
+
+tk.Label(viewer_controls, text="Show:", bg="#E8F4F8", fg="#2C3E50",
+         font=("Arial", 10, "bold")).pack(side="left")
+filter_var = tk.StringVar(value="All Steps")
+filter_dropdown = ttk.Combobox(viewer_controls, textvariable=filter_var, values=list(STEP_FILTERS),
+                               state="readonly", width=14)
+filter_dropdown.pack(side="left", padx=(2, 8))
+filter_dropdown.bind("<<ComboboxSelected>>", apply_step_filter)
+
+export_button = tk.Button(viewer_controls, text="Export", font=("Arial", 10, "bold"),
+                          bg="#8E44AD", fg="white", activebackground="#A569BD", activeforeground="white",
+                          width=7, command=export_step_events)
+export_button.pack(side="left", padx=(0, 8))
+
+jump_button = tk.Button(viewer_controls, text="Go", font=("Arial", 10, "bold"),
+                        bg="#1ABC9C", fg="white", activebackground="#1ABC9C", activeforeground="white",
+                        width=4, command=jump_to_step)
+jump_button.pack(side="right")
+jump_entry = ttk.Entry(viewer_controls, width=10)
+jump_entry.pack(side="right", padx=(2, 4))
+jump_entry.bind("<Return>", jump_to_step)
+tk.Label(viewer_controls, text="Step:", bg="#E8F4F8", fg="#2C3E50",
+         font=("Arial", 10, "bold")).pack(side="right")
+
+# Scrubber over the (filtered) steps
+step_scale = tk.Scale(output_frame, from_=1, to=1, orient="horizontal", showvalue=False,
+                      bg="#E8F4F8", highlightthickness=0, command=scrub_steps)
+step_scale.pack(fill="x", padx=8)
+
+# Scrollbar over the whole trace - only the visible window of steps is ever rendered
+scrollbar = ttk.Scrollbar(output_frame, orient="vertical", command=scroll_steps)
+scrollbar.pack(side="right", fill="y", pady=8)
+
 # Results Area with bolder and larger text - Modified as requested
-results_text = tk.Text(output_frame, wrap=tk.WORD, state=tk.DISABLED,
+results_text = tk.Text(output_frame, wrap=tk.NONE, state=tk.DISABLED,
                        font=("Courier New", 12, "bold"), bg="#FFFFFF", fg="#333333")  # Increased font size and bold
-results_text.pack(fill="both", expand=True, padx=8, pady=8)
-
-# Add Scrollbar with styling
-scrollbar = ttk.Scrollbar(output_frame, orient="vertical", command=results_text.yview)
-scrollbar.pack(side="right", fill="y")
-results_text.config(yscrollcommand=scrollbar.set)
+results_text.pack(fill="both", expand=True, padx=(8, 0), pady=8)
+results_text.bind("<Configure>", lambda event: render_steps())
+results_text.bind("<MouseWheel>", lambda event: scroll_steps("scroll", -1 if event.delta > 0 else 1, "units"))
+results_text.bind("<Button-4>", lambda event: scroll_steps("scroll", -1, "units"))
+results_text.bind("<Button-5>", lambda event: scroll_steps("scroll", 1, "units"))
 
 # Configure text tags for colored output - Made bolder and larger
 results_text.tag_configure("header", foreground="#2980B9", font=("Courier New", 14, "bold"))
@@ -465,6 +1059,9 @@ results_text.tag_configure("hit_text", foreground="#27AE60", font=("Courier New"
 results_text.tag_configure("miss_text", foreground="#E74C3C", font=("Courier New", 13, "bold"))
 results_text.tag_configure("swap", foreground="#2C3E50",
                            font=("Courier New", 12))  # Changed color for better visibility
+results_text.tag_configure("current", background="#FCF3CF")
+
+step_line_height = tkfont.Font(font=("Courier New", 13, "bold")).metrics("linespace")
 
 
 # Update Total Pages
@@ -488,6 +1085,10 @@ memory_entry.insert(0, "1024")
 page_size_entry.insert(0, "256")
 frames_entry.insert(0, "3")
 reference_entry.insert(0, "1 2 3 4 1 2 5 1 2 3 4 5")
+tlb_entries_entry.insert(0, "16")
+tlb_ways_entry.insert(0, "4")
+replicas_entry.insert(0, "1")
+seed_entry.insert(0, "0")
 
 # Calculate total pages on startup
 update_total_pages()
@@ -0,0 +1,164 @@
+# PageControl simulation engine - pure Python, no GUI dependencies
+from .policies import (
+    LOOKAHEAD,
+    PROGRESS_INTERVAL,
+    ARCPolicy,
+    ClockPolicy,
+    FIFOPolicy,
+    LFUPolicy,
+    LIRSPolicy,
+    LookaheadOptimalPolicy,
+    LRUPolicy,
+    OptimalPolicy,
+    RandomPolicy,
+    SimulationCancelled,
+    TwoQPolicy,
+    as_sequence,
+    fifo_paging,
+    lru_paging,
+    next_use_index,
+    optimal_paging,
+    parse_reference_string,
+    random_paging,
+    simulate,
+)
+from .registry import ALGORITHMS, POLICIES, make_policy, register_policy, resolve_algorithm, run_policy
+from .trace import STEP_EVICT, STEP_HIT, STEP_MISS, StepTrace
+from .tracefile import iter_text_trace, load_trace, open_binary_trace, write_binary_trace
+from .cache import ResultCache, trace_fingerprint
+from .montecarlo import monte_carlo, replica_seeds
+from .compare import compare_algorithms
+from .incremental import IncrementalSimulation
+from .export import (
+    COMPARISON_COLUMNS,
+    EXPORT_FORMATS,
+    STEP_COLUMNS,
+    export_comparison,
+    export_steps,
+    export_sweep,
+    stream_steps,
+)
+from .instrument import SAMPLE_INTERVAL, InstrumentedPolicy, profile_run
+from .address import (
+    TLB,
+    TLB_POLICIES,
+    TranslatedPolicy,
+    addresses_to_pages,
+    effective_access_time,
+    simulate_addresses,
+    simulate_translation,
+)
+from .sweep import SWEEP_COLUMNS, run_sweep, share_trace
+from .workloads import (
+    WORKLOADS,
+    generate_workload,
+    loop_workload,
+    mixed_workload,
+    parse_mix,
+    phase_workload,
+    scan_workload,
+    uniform_workload,
+    zipf_workload,
+)
+from .bench import BENCH_WORKLOADS, compare_to_baseline, load_baseline, run_benchmarks, save_baseline
+from .mrc import STACK_ALGORITHMS, lru_stack_histogram, miss_ratio_curve, opt_stack_histogram
+from .multiprocess import (
+    ALLOCATIONS,
+    REPLACEMENTS,
+    GlobalMemory,
+    LocalMemory,
+    PFFMemory,
+    WorkingSetMemory,
+    allocate_frames,
+    simulate_processes,
+)
+
+__all__ = [
+    "ALGORITHMS",
+    "ALLOCATIONS",
+    "ARCPolicy",
+    "BENCH_WORKLOADS",
+    "COMPARISON_COLUMNS",
+    "ClockPolicy",
+    "EXPORT_FORMATS",
+    "FIFOPolicy",
+    "GlobalMemory",
+    "IncrementalSimulation",
+    "InstrumentedPolicy",
+    "LFUPolicy",
+    "LIRSPolicy",
+    "LOOKAHEAD",
+    "LRUPolicy",
+    "LocalMemory",
+    "LookaheadOptimalPolicy",
+    "OptimalPolicy",
+    "PFFMemory",
+    "POLICIES",
+    "PROGRESS_INTERVAL",
+    "REPLACEMENTS",
+    "RandomPolicy",
+    "ResultCache",
+    "SAMPLE_INTERVAL",
+    "STACK_ALGORITHMS",
+    "STEP_COLUMNS",
+    "STEP_EVICT",
+    "STEP_HIT",
+    "STEP_MISS",
+    "SWEEP_COLUMNS",
+    "SimulationCancelled",
+    "StepTrace",
+    "TLB",
+    "TLB_POLICIES",
+    "TranslatedPolicy",
+    "TwoQPolicy",
+    "WORKLOADS",
+    "WorkingSetMemory",
+    "addresses_to_pages",
+    "allocate_frames",
+    "as_sequence",
+    "compare_algorithms",
+    "compare_to_baseline",
+    "effective_access_time",
+    "export_comparison",
+    "export_steps",
+    "export_sweep",
+    "fifo_paging",
+    "generate_workload",
+    "iter_text_trace",
+    "load_baseline",
+    "load_trace",
+    "loop_workload",
+    "lru_paging",
+    "lru_stack_histogram",
+    "make_policy",
+    "miss_ratio_curve",
+    "mixed_workload",
+    "monte_carlo",
+    "next_use_index",
+    "open_binary_trace",
+    "opt_stack_histogram",
+    "optimal_paging",
+    "parse_mix",
+    "parse_reference_string",
+    "phase_workload",
+    "profile_run",
+    "random_paging",
+    "register_policy",
+    "replica_seeds",
+    "resolve_algorithm",
+    "run_benchmarks",
+    "run_policy",
+    "run_sweep",
+    "save_baseline",
+    "scan_workload",
+    "share_trace",
+    "simulate",
+    "simulate_addresses",
+    "simulate_processes",
+    "simulate_translation",
+    "stream_steps",
+    "trace_fingerprint",
+    "uniform_workload",
+    "write_binary_trace",
+    "zipf_workload",
+]
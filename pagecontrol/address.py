@@ -0,0 +1,155 @@
+import random
+from array import array
+from collections import OrderedDict
+from itertools import islice
+
+from .policies import as_sequence, optional_numpy, simulate
+from .registry import make_policy, resolve_algorithm
+
+# Address-trace mode: byte addresses are translated to page numbers and every reference goes
+# through a TLB before it reaches the page-frame simulation.
+
+TLB_POLICIES = ["LRU", "FIFO", "Random"]
+
+# Default latencies in nanoseconds: TLB lookup, one memory access, and servicing a page fault
+TLB_TIME = 1
+MEMORY_TIME = 100
+FAULT_TIME = 8000000
+
+
+# Translate byte addresses to page numbers (address // page_size), checking every address
+# against the size of memory. Returns an int64 array (the engine's compact format).
+def addresses_to_pages(addresses, page_size, total_memory=None):
+    if page_size <= 0:
+        raise ValueError("Page size must be a positive integer.")
+    addresses = as_sequence(addresses)
+    if len(addresses) == 0:
+        raise ValueError("Address trace must not be empty.")
+
+    np = optional_numpy()  # Without NumPy, addresses are translated one by one
+    if np is not None:
+        values = np.asarray(addresses, dtype=np.int64)
+        lowest, highest = int(values.min()), int(values.max())
+    else:
+        lowest, highest = min(addresses), max(addresses)
+    if lowest < 0:
+        raise ValueError(f"Address {lowest} is negative.")
+    if total_memory is not None and highest >= total_memory:
+        raise ValueError(f"Address {highest} is outside the {total_memory} bytes of memory.")
+
+    if np is not None:
+        return array("q", (values // page_size).tobytes())
+    return array("q", (address // page_size for address in addresses))
+
+
+# Set-associative TLB caching page translations.
+# A page maps to set page % num_sets; each set holds `ways` entries in an OrderedDict (oldest or
+# least recently used first) and evicts by LRU, FIFO or Random. ways=None is fully associative.
+class TLB:
+    def __init__(self, entries, ways=None, replacement="LRU", seed=None):
+        ways = ways or entries
+        if entries <= 0 or ways <= 0:
+            raise ValueError("TLB entries and associativity must be positive integers.")
+        if entries % ways:
+            raise ValueError("TLB entries must be a multiple of the associativity.")
+        if replacement not in TLB_POLICIES:
+            raise ValueError(f"Unknown TLB replacement policy: {replacement}")
+        self.entries = entries
+        self.ways = ways
+        self.num_sets = entries // ways
+        self.replacement = replacement
+        self.sets = [OrderedDict() for _ in range(self.num_sets)]
+        self.rng = random.Random(seed)
+        self.hits = 0
+        self.misses = 0
+
+    # Look up a page, caching its translation on a miss. Returns True on a TLB hit.
+    def lookup(self, page):
+        entries = self.sets[page % self.num_sets]
+        if page in entries:
+            self.hits += 1
+            if self.replacement == "LRU":
+                entries.move_to_end(page)
+            return True
+        self.misses += 1
+        if len(entries) >= self.ways:
+            if self.replacement == "Random":
+                del entries[next(islice(entries, self.rng.randrange(len(entries)), None))]
+            else:
+                entries.popitem(last=False)
+        entries[page] = None
+        return False
+
+    # Drop the translation of a page that was evicted from memory
+    def invalidate(self, page):
+        self.sets[page % self.num_sets].pop(page, None)
+
+
+# Policy engine wrapper that puts a TLB in front of a page-frame policy.
+# Every reference is looked up in the TLB and then passed to the policy, and evicted pages are
+# invalidated in the TLB, so it only ever holds resident pages and the fault counts are unchanged.
+class TranslatedPolicy:
+    def __init__(self, policy, tlb):
+        self.policy = policy
+        self.tlb = tlb
+        self.num_frames = policy.num_frames
+        self.reorder_on_hit = policy.reorder_on_hit
+        self.requires_future = policy.requires_future
+        self.randomized = policy.randomized
+
+    def access(self, page):
+        self.tlb.lookup(page)
+        result = self.policy.access(page)
+        if result[1] is not None:
+            self.tlb.invalidate(result[1])
+        return result
+
+    def frames(self):
+        return self.policy.frames()
+
+
+# Average nanoseconds per reference: the TLB lookup, a page table access on a TLB miss,
+# the memory access itself, and the fault service time on a page fault
+def effective_access_time(tlb_hit_rate, fault_rate, tlb_time=TLB_TIME, memory_time=MEMORY_TIME,
+                          fault_time=FAULT_TIME):
+    return tlb_time + (1 - tlb_hit_rate) * memory_time + memory_time + fault_rate * fault_time
+
+
+# Run page numbers through a TLB and a page replacement policy.
+# Returns a dict with the usual hits/misses/ratios and trace, plus the TLB counters,
+# the page fault rate and the effective access time in nanoseconds.
+def simulate_translation(pages, algorithm, num_frames, tlb_entries=64, tlb_ways=None, tlb_policy="LRU",
+                         record_trace=True, progress=None, tlb_time=TLB_TIME, memory_time=MEMORY_TIME,
+                         fault_time=FAULT_TIME, seed=None):
+    algo = resolve_algorithm(algorithm)
+    pages = as_sequence(pages)
+    tlb = TLB(tlb_entries, tlb_ways, tlb_policy, seed)
+    policy = TranslatedPolicy(make_policy(algo, num_frames, pages, seed), tlb)
+    hits, misses, hit_ratio, miss_ratio, trace = simulate(policy, pages, record_trace, progress)
+
+    tlb_hit_rate = tlb.hits / (tlb.hits + tlb.misses)
+    return {
+        "algorithm": algo,
+        "frames": num_frames,
+        "references": hits + misses,
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": hit_ratio,
+        "miss_ratio": miss_ratio,
+        "tlb_entries": tlb.entries,
+        "tlb_ways": tlb.ways,
+        "tlb_policy": tlb.replacement,
+        "tlb_hits": tlb.hits,
+        "tlb_misses": tlb.misses,
+        "tlb_hit_rate": tlb_hit_rate,
+        "page_fault_rate": miss_ratio,
+        "effective_access_time": effective_access_time(tlb_hit_rate, miss_ratio, tlb_time, memory_time,
+                                                       fault_time),
+        "trace": trace,
+    }
+
+
+# Address-trace mode: translate byte addresses to pages, then simulate the TLB and page frames
+def simulate_addresses(addresses, page_size, algorithm, num_frames, total_memory=None, **options):
+    return simulate_translation(addresses_to_pages(addresses, page_size, total_memory), algorithm,
+                                num_frames, **options)
@@ -0,0 +1,113 @@
+import json
+import platform
+import time
+import tracemalloc
+
+from .registry import ALGORITHMS, resolve_algorithm, run_policy
+from .workloads import generate_workload
+
+DEFAULT_SIZES = [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6]
+DEFAULT_FRAMES = [16, 256, 4096]
+BENCH_WORKLOADS = ["uniform", "zipf", "loop", "phases"]
+BASELINE_VERSION = 2  # Version 1 results lacked the record_trace, seed and repeat fields
+
+# Fields identifying the same benchmark case across runs. Traced runs, other workload seeds and
+# other repeat counts time something else, so they never match each other.
+CASE_KEY = ("workload", "references", "frames", "algorithm", "record_trace", "seed", "repeat")
+
+
+# Seconds taken by one stats-only (or trace-recording) run, best of `repeat`
+def time_policy(algo, reference_string, num_frames, record_trace=False, repeat=1):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run_policy(algo, reference_string, num_frames, record_trace)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+# Peak bytes allocated by Python during one run (traced separately, since tracing slows the run)
+def peak_memory(algo, reference_string, num_frames, record_trace=False):
+    tracemalloc.start()
+    try:
+        run_policy(algo, reference_string, num_frames, record_trace)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+# Run every (workload, size, frames, algorithm) case and yield one result dict per case
+def run_benchmarks(sizes=None, frame_counts=None, algorithms=None, workloads=None,
+                   record_trace=False, measure_memory=True, repeat=1, seed=0):
+    algorithms = [resolve_algorithm(name) for name in (algorithms or ALGORITHMS)]
+    for workload in workloads or BENCH_WORKLOADS:
+        for size in sizes or DEFAULT_SIZES:
+            # The trace is generated once per size, outside the timed region
+            reference_string = generate_workload(workload, size, seed=seed)
+            for num_frames in frame_counts or DEFAULT_FRAMES:
+                for algo in algorithms:
+                    seconds = time_policy(algo, reference_string, num_frames, record_trace, repeat)
+                    result = {
+                        "workload": workload,
+                        "references": size,
+                        "frames": num_frames,
+                        "algorithm": algo,
+                        "record_trace": record_trace,
+                        "seed": seed,
+                        "repeat": repeat,
+                        "seconds": seconds,
+                        "refs_per_sec": size / seconds if seconds else float("inf"),
+                        "peak_memory": None,
+                    }
+                    if measure_memory:
+                        result["peak_memory"] = peak_memory(algo, reference_string, num_frames, record_trace)
+                    yield result
+
+
+def save_baseline(path, results):
+    baseline = {
+        "version": BASELINE_VERSION,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": list(results),
+    }
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=1)
+
+
+def load_baseline(path):
+    with open(path) as f:
+        baseline = json.load(f)
+    if baseline.get("version") != BASELINE_VERSION:
+        raise ValueError(f"Unsupported benchmark baseline version in {path}.")
+    return baseline
+
+
+# Compare results with a saved baseline. Each matching case gets the throughput ratio
+# (current / baseline) and a verdict: "faster", "slower" or "same" within the tolerance.
+def compare_to_baseline(results, baseline, tolerance=0.10):
+    previous = {tuple(row[field] for field in CASE_KEY): row for row in baseline["results"]}
+    comparison = []
+    for row in results:
+        old = previous.get(tuple(row[field] for field in CASE_KEY))
+        if old is None:
+            continue
+        ratio = row["refs_per_sec"] / old["refs_per_sec"]
+        if ratio > 1 + tolerance:
+            verdict = "faster"
+        elif ratio < 1 - tolerance:
+            verdict = "slower"
+        else:
+            verdict = "same"
+        entry = {field: row[field] for field in CASE_KEY}
+        entry.update(
+            baseline_refs_per_sec=old["refs_per_sec"],
+            refs_per_sec=row["refs_per_sec"],
+            speedup=ratio,
+            verdict=verdict,
+        )
+        if row["peak_memory"] is not None and old.get("peak_memory"):
+            entry["memory_ratio"] = row["peak_memory"] / old["peak_memory"]
+        comparison.append(entry)
+    return comparison
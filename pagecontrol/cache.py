@@ -0,0 +1,135 @@
+import hashlib
+import threading
+from array import array
+from collections import OrderedDict
+
+from .policies import as_sequence
+from .registry import POLICIES, resolve_algorithm, run_policy
+
+# Values hashed per block when a trace has to be converted to int64 first
+FINGERPRINT_CHUNK = 1 << 20
+
+
+# Fingerprint of a reference string: BLAKE2b over its pages as native int64 values, so the same
+# pages give the same key whether they came from a list, a text trace or an int32/int64 file
+def trace_fingerprint(reference_string):
+    reference_string = as_sequence(reference_string)
+    digest = hashlib.blake2b(digest_size=16)
+    if getattr(reference_string, "typecode", None) == "q" or getattr(reference_string, "format", None) == "q":
+        digest.update(reference_string)
+    else:
+        for start in range(0, len(reference_string), FINGERPRINT_CHUNK):
+            digest.update(array("q", reference_string[start:start + FINGERPRINT_CHUNK]))
+    return digest.hexdigest()
+
+
+# Memoized simulation results keyed by (trace fingerprint, policy, frames, seed).
+# Results are kept in an in-memory LRU limited to max_entries results and max_steps recorded
+# trace steps. With a path, stats-only results are also stored in an SQLite file so they
+# survive across sessions. Safe to share between the GUI thread and worker threads.
+class ResultCache:
+    def __init__(self, max_entries=256, max_steps=10 ** 7, path=None):
+        self.max_entries = max_entries
+        self.max_steps = max_steps
+        self.entries = OrderedDict()
+        self.steps = 0  # Recorded steps held by the cached traces
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.db = None
+        if path is not None:
+            import sqlite3  # Only persistent caches need it
+
+            self.db = sqlite3.connect(path, check_same_thread=False)
+            self.db.execute("CREATE TABLE IF NOT EXISTS results (trace TEXT, algorithm TEXT, frames INTEGER, "
+                            "seed TEXT, hits INTEGER, misses INTEGER, PRIMARY KEY (trace, algorithm, frames, seed))")
+            self.db.commit()
+
+    def __len__(self):
+        return len(self.entries)
+
+    # Cache key of a run, or None when the run can't be reproduced (a randomized policy without a seed).
+    # The seed is dropped for deterministic policies, which ignore it.
+    def key(self, fingerprint, algorithm, num_frames, seed=None):
+        algo = resolve_algorithm(algorithm)
+        if not POLICIES[algo].randomized:
+            seed = None
+        elif seed is None:
+            return None
+        return fingerprint, algo, num_frames, seed
+
+    # Cached (hits, misses, hit_ratio, miss_ratio, trace) for a key, or None.
+    # With need_trace only a result that recorded its step trace will do.
+    def get(self, key, need_trace=False):
+        with self.lock:
+            result = self.entries.get(key)
+            if result is not None and (result[4] is not None or not need_trace):
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return result
+            if self.db is not None and not need_trace:
+                row = self.db.execute(
+                    "SELECT hits, misses FROM results WHERE trace = ? AND algorithm = ? AND frames = ? AND seed = ?",
+                    self._row_key(key)).fetchone()
+                if row is not None:
+                    hits, misses = row
+                    result = (hits, misses, hits / (hits + misses), misses / (hits + misses), None)
+                    self._remember(key, result)
+                    self.hits += 1
+                    return result
+            self.misses += 1
+            return None
+
+    def put(self, key, result):
+        with self.lock:
+            self._remember(key, result)
+            if self.db is not None:
+                self.db.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)",
+                                (*self._row_key(key), result[0], result[1]))
+                self.db.commit()
+
+    # Run a registered policy, or return the cached result of the same run
+    def run(self, algorithm, reference_string, num_frames, record_trace=True, progress=None, seed=None,
+            fingerprint=None):
+        reference_string = as_sequence(reference_string)
+        key = self.key(fingerprint or trace_fingerprint(reference_string), algorithm, num_frames, seed)
+        if key is None:
+            return run_policy(algorithm, reference_string, num_frames, record_trace, progress, seed)
+        result = self.get(key, need_trace=record_trace)
+        if result is None:
+            result = run_policy(algorithm, reference_string, num_frames, record_trace, progress, seed)
+            self.put(key, result)
+        elif not record_trace and result[4] is not None:
+            result = result[:4] + (None,)
+        return result
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.steps = 0
+
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+    def _row_key(self, key):
+        fingerprint, algo, num_frames, seed = key
+        return fingerprint, algo, num_frames, "" if seed is None else str(seed)
+
+    # Add to the in-memory LRU, evicting the least recently used results past the limits.
+    # A stats-only result never replaces a cached one that has its step trace.
+    def _remember(self, key, result):
+        previous = self.entries.pop(key, None)
+        if previous is not None:
+            if previous[4] is not None and result[4] is None:
+                result = previous
+            if previous[4] is not None:
+                self.steps -= len(previous[4])
+        if result[4] is not None:
+            self.steps += len(result[4])
+        self.entries[key] = result
+        while self.entries and (len(self.entries) > self.max_entries or self.steps > self.max_steps):
+            _, evicted = self.entries.popitem(last=False)
+            if evicted[4] is not None:
+                self.steps -= len(evicted[4])
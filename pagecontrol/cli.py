@@ -0,0 +1,520 @@
+import argparse
+import json
+import sys
+
+from .address import FAULT_TIME, MEMORY_TIME, TLB_POLICIES, TLB_TIME, simulate_addresses
+from .cache import ResultCache
+from .bench import BENCH_WORKLOADS, compare_to_baseline, load_baseline, run_benchmarks, save_baseline
+from .compare import compare_algorithms
+from .export import export_comparison, export_sweep, stream_steps
+from .incremental import IncrementalSimulation
+from .instrument import profile_run
+from .mrc import STACK_ALGORITHMS, miss_ratio_curve
+from .multiprocess import (
+    ALLOCATIONS,
+    FAULT_SERVICE,
+    PFF_INTERVAL,
+    QUANTUM,
+    REPLACEMENTS,
+    THRASH_WINDOW,
+    WS_WINDOW,
+    simulate_processes,
+)
+from .policies import LOOKAHEAD, as_sequence, parse_reference_string
+from .registry import ALGORITHMS, resolve_algorithm
+from .sweep import SWEEP_COLUMNS, run_sweep
+from .tracefile import TRACE_FORMATS, load_trace, write_binary_trace
+from .workloads import WORKLOADS, generate_workload, parse_mix
+
+
+# Generate the named synthetic workload with the workload options given on the command line
+# (and the --seed option unless a seed is given)
+def generate_from_args(args, name, seed=None):
+    params = {
+        "pages": args.pages,
+        "skew": args.skew,
+        "working_set": args.working_set,
+        "phase_length": args.phase_length,
+    }
+    params = {key: value for key, value in params.items() if value is not None}
+    if name == "mix":
+        if not args.mix:
+            raise ValueError("The mix workload needs --mix, e.g. --mix zipf:0.7,scan:0.3")
+        params["components"] = parse_mix(args.mix)
+    return generate_workload(name, args.length, seed=args.seed if seed is None else seed, **params)
+
+
+# Read the reference string from a workload, a trace file, the command line, or stdin
+def load_reference_string(args):
+    if args.workload is not None:
+        return generate_from_args(args, args.workload)
+    if args.trace_file is not None:
+        return load_trace(args.trace_file, args.format)
+    text = args.reference if args.reference is not None else sys.stdin.read()
+    return parse_reference_string(text)
+
+
+def run_command(args):
+    algo = resolve_algorithm(args.algorithm)
+    if args.export:
+        # Exported steps stream from a plain engine run, so it is neither profiled, cached nor listed
+        for option, value in (("--steps", args.steps), ("--profile", args.profile), ("--cache", args.cache)):
+            if value:
+                raise ValueError(f"--export can't be combined with {option}.")
+    reference_string = load_reference_string(args)
+    stats = None
+    if args.export:
+        # Step events go straight from the engine to the file
+        hits, misses, hit_ratio, miss_ratio, frame_orders = stream_steps(
+            algo, reference_string, args.frames, args.export)
+    elif args.profile:
+        (hits, misses, hit_ratio, miss_ratio, frame_orders), stats = profile_run(
+            algo, reference_string, args.frames, record_trace=args.steps)
+    elif args.cache:
+        cache = ResultCache(path=args.cache)
+        try:
+            hits, misses, hit_ratio, miss_ratio, frame_orders = cache.run(
+                algo, reference_string, args.frames, record_trace=args.steps)
+        finally:
+            cache.close()
+    else:
+        hits, misses, hit_ratio, miss_ratio, frame_orders = ALGORITHMS[algo](
+            reference_string, args.frames, record_trace=args.steps)
+
+    output = {
+        "algorithm": algo,
+        "frames": args.frames,
+        "references": hits + misses,
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": hit_ratio,
+        "miss_ratio": miss_ratio,
+    }
+    if stats is not None:
+        output["performance"] = stats
+    if args.export:
+        output["export"] = args.export
+    elif args.steps:
+        output["steps"] = [
+            {"step": step, "frames": frames, "status": status.replace(" --> ", ""), "swap_space": swap}
+            for frames, status, swap, step in frame_orders
+        ]
+    return output
+
+
+# Address-trace mode: the trace holds byte addresses, translated through a TLB
+def address_command(args):
+    output = simulate_addresses(
+        load_reference_string(args), args.page_size, args.algorithm, args.frames, args.memory,
+        tlb_entries=args.tlb_entries, tlb_ways=args.tlb_ways, tlb_policy=args.tlb_policy, record_trace=False,
+        tlb_time=args.tlb_time, memory_time=args.memory_time, fault_time=args.fault_time)
+    del output["trace"]
+    return output
+
+
+# Follow a growing trace on stdin (e.g. tail -f trace.txt | pagecontrol stream ...), printing the
+# running totals every --every references. Only the new references are simulated each time.
+def stream_command(args):
+    simulation = IncrementalSimulation(args.algorithm, args.frames, record_trace=False, lookahead=args.lookahead)
+    if not simulation.resumable:
+        # It would be re-run over the whole stream on every batch
+        raise ValueError(f"{simulation.algorithm} needs the whole reference string in advance, so it can't follow "
+                         "a stream; use OPT (Lookahead) instead.")
+    batch = []
+    for line in sys.stdin:
+        try:
+            batch.extend(map(int, line.split()))
+        except ValueError:
+            raise ValueError("Reference string must contain integers separated by spaces.") from None
+        if len(batch) >= args.every:
+            report_stream(simulation, batch)
+            batch = []
+    if batch or not len(simulation):
+        report_stream(simulation, batch)
+
+
+def report_stream(simulation, batch):
+    hits, misses, hit_ratio, miss_ratio, _ = simulation.extend(batch)
+    json.dump({"algorithm": simulation.algorithm, "frames": simulation.num_frames, "references": hits + misses,
+               "hits": hits, "misses": misses, "hit_ratio": hit_ratio, "miss_ratio": miss_ratio,
+               "pending": len(simulation) - simulation.done}, sys.stdout)
+    sys.stdout.write("\n")
+    sys.stdout.flush()
+
+
+# Extra fields of a comparison row averaged over Monte-Carlo replicas
+def monte_carlo_columns(estimate):
+    if estimate is None:
+        return {}
+    return {"replicas": estimate["replicas"], "hit_ratio_stddev": estimate["hit_ratio_stddev"],
+            "hit_ratio_ci": list(estimate["hit_ratio_ci"])}
+
+
+def compare_command(args):
+    # Every algorithm walks the trace, so a streamed file is packed once into a compact array
+    reference_string = as_sequence(load_reference_string(args))
+    cache = ResultCache(path=args.cache) if args.cache else None
+    performance = [] if args.profile else None
+    try:
+        results, best_algorithm, best_metric, metric_name, spread = compare_algorithms(
+            reference_string, args.frames, args.criteria, cache=cache, replicas=args.replicas,
+            seed=args.random_seed, workers=args.workers,
+            on_stats=performance.append if performance is not None else None)
+    finally:
+        if cache is not None:
+            cache.close()
+    if args.export:
+        export_comparison((results, best_algorithm, best_metric, metric_name, spread), args.export)
+
+    return {
+        "frames": args.frames,
+        "references": len(reference_string),
+        "criteria": metric_name,
+        "results": [
+            {"algorithm": algo, "hits": hits, "misses": misses, "hit_ratio": hit_ratio, "miss_ratio": miss_ratio,
+             **monte_carlo_columns(spread.get(algo))}
+            for algo, hits, misses, hit_ratio, miss_ratio in results
+        ],
+        "best_algorithm": best_algorithm[0],
+        "best_metric": best_metric,
+        **({"performance": performance} if performance is not None else {}),
+    }
+
+
+def mrc_command(args):
+    reference_string = as_sequence(load_reference_string(args))
+    algorithms = [resolve_algorithm(name) for name in args.algorithm or STACK_ALGORITHMS]
+
+    return {
+        "max_frames": args.frames,
+        "references": len(reference_string),
+        "curves": {
+            algo: [
+                {"frames": frames, "hits": hits, "misses": misses, "hit_ratio": hit_ratio, "miss_ratio": miss_ratio}
+                for frames, hits, misses, hit_ratio, miss_ratio in miss_ratio_curve(reference_string, args.frames, algo)
+            ]
+            for algo in algorithms
+        },
+    }
+
+
+# Streams one JSON row per finished job instead of a single document
+def sweep_command(args):
+    traces = [generate_from_args(args, name) for name in args.workload or []]
+    traces += [load_trace(path, args.format) for path in args.trace_file or []]
+    if not traces:
+        text = args.reference if args.reference is not None else sys.stdin.read()
+        traces = [parse_reference_string(text)]
+
+    cache = ResultCache(path=args.cache) if args.cache else None
+    try:
+        rows = run_sweep(traces, args.frames, args.algorithm, args.workers, cache)
+        if args.export:
+            # Rows are still printed as they finish, then written to the file in chunks
+            export_sweep(map(print_sweep_row, rows), args.export)
+        else:
+            for row in rows:
+                print_sweep_row(row)
+    finally:
+        if cache is not None:
+            cache.close()
+
+
+# One process per trace file and workload, each repeated --processes times; copies of a workload
+# use consecutive seeds so they don't run in lockstep
+def multi_command(args):
+    traces = []
+    for name in args.workload or []:
+        traces += [generate_from_args(args, name, args.seed + copy) for copy in range(args.processes)]
+    for path in args.trace_file or []:
+        trace = as_sequence(load_trace(path, args.format))
+        traces += [trace] * args.processes
+    if not traces:
+        raise ValueError("Give at least one process trace with -t or -w.")
+    return simulate_processes(
+        traces, args.frames, args.algorithm, args.replacement, args.allocation, quantum=args.quantum,
+        weights=args.weights, fault_service=args.fault_service, window=args.window,
+        pff_interval=args.pff_interval, thrash_window=args.thrash_window, seed=args.random_seed)
+
+
+def print_sweep_row(row):
+    json.dump(dict(zip(SWEEP_COLUMNS, row)), sys.stdout)
+    sys.stdout.write("\n")
+    sys.stdout.flush()
+    return row
+
+
+# Streams one JSON line per benchmark case; with --baseline a final line summarises the comparison
+# and the exit status is 1 when any case got slower
+def bench_command(args):
+    results = []
+    for result in run_benchmarks(args.sizes, args.frames, args.algorithm, args.workload,
+                                 args.record_trace, not args.no_memory, args.repeat, args.seed):
+        results.append(result)
+        json.dump(result, sys.stdout)
+        sys.stdout.write("\n")
+        sys.stdout.flush()
+
+    if args.baseline:
+        comparison = compare_to_baseline(results, load_baseline(args.baseline), args.tolerance)
+        if results and not comparison:
+            raise ValueError(f"No case in {args.baseline} matches this run; the workload, sizes, frames, "
+                             "algorithms, --record-trace, --seed and --repeat must agree.")
+        regressions = [row for row in comparison if row["verdict"] == "slower"]
+        json.dump({"baseline": args.baseline, "compared": len(comparison),
+                   "regressions": len(regressions), "comparison": comparison}, sys.stdout)
+        sys.stdout.write("\n")
+        if regressions:
+            args.exit_status = 1
+    if args.save:
+        save_baseline(args.save, results)
+
+
+# Write a synthetic workload to a trace file
+def generate_command(args):
+    references = generate_from_args(args, args.workload)
+    if args.format == "text":
+        with open(args.output, "w") as f:
+            for start in range(0, len(references), 1 << 16):
+                f.write("\n".join(map(str, references[start:start + (1 << 16)])))
+                f.write("\n")
+    else:
+        write_binary_trace(args.output, references, args.format)
+    return {"workload": args.workload, "references": len(references), "output": args.output, "format": args.format}
+
+
+def add_workload_options(subparser, repeatable=False, required=False):
+    if repeatable:
+        subparser.add_argument("-w", "--workload", action="append", choices=list(WORKLOADS), required=required,
+                               help="synthetic workload to include, may be repeated")
+    else:
+        subparser.add_argument("-w", "--workload", choices=list(WORKLOADS), required=required,
+                               help="use a synthetic workload as the reference string")
+    subparser.add_argument("--length", type=positive_count, default=10 ** 6,
+                           help="workload length (default: 1e6)")
+    subparser.add_argument("--seed", type=int, default=0, help="workload seed")
+    subparser.add_argument("--pages", type=positive_int, help="distinct pages in the workload")
+    subparser.add_argument("--skew", type=float, help="Zipf skew")
+    subparser.add_argument("--working-set", type=positive_int, help="working set size of the phases workload")
+    subparser.add_argument("--phase-length", type=positive_int, help="references per phase")
+    subparser.add_argument("--mix", help="components of the mix workload, e.g. zipf:0.7,scan:0.3")
+
+
+def add_profile_option(subparser):
+    subparser.add_argument("--profile", metavar="PATH",
+                           help="instrument the runs, add their performance stats to the output and write "
+                                "a cProfile dump to PATH (or the stats as JSON when PATH ends in .json)")
+
+
+def add_export_option(subparser, what):
+    subparser.add_argument("--export", metavar="PATH",
+                           help=f"write the {what} to a .csv, .npz or .parquet file")
+
+
+def add_cache_option(subparser):
+    subparser.add_argument("--cache", metavar="PATH",
+                           help="SQLite file of cached results, reused across runs (created if missing)")
+
+
+def positive_int(value):
+    number = int(value)
+    if number <= 0:
+        raise argparse.ArgumentTypeError("must be a positive integer")
+    return number
+
+
+# Positive integer that may be written in scientific notation, e.g. 1e6
+def positive_count(value):
+    try:
+        number = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError("must be a positive integer") from None
+    if number <= 0 or number != int(number):
+        raise argparse.ArgumentTypeError("must be a positive integer")
+    return int(number)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="pagecontrol",
+                                     description="Headless page replacement simulator (prints JSON).")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    def add_common(subparser):
+        subparser.add_argument("-f", "--frames", type=positive_int, required=True,
+                               help="number of memory frames")
+        subparser.add_argument("-r", "--reference",
+                               help="space separated reference string (read from stdin when omitted)")
+        subparser.add_argument("-t", "--trace-file",
+                               help="read the reference string from a trace file instead")
+        subparser.add_argument("--format", choices=TRACE_FORMATS, default="text",
+                               help="trace file format: whitespace separated text (plain or gzip), "
+                                    "or raw little-endian int32/int64")
+        add_workload_options(subparser)
+
+    run_parser = subparsers.add_parser("run", help="run a single paging algorithm")
+    add_common(run_parser)
+    run_parser.add_argument("-a", "--algorithm", required=True,
+                            help="policy name, e.g. FIFO, LRU, OPT, RAND, CLOCK, LFU, ARC, 2Q or LIRS")
+    run_parser.add_argument("--steps", action="store_true", help="include the step-by-step frame state")
+    add_export_option(run_parser, "step events (streamed from the engine)")
+    add_profile_option(run_parser)
+    add_cache_option(run_parser)
+    run_parser.set_defaults(handler=run_command)
+
+    address_parser = subparsers.add_parser("address", help="simulate a trace of byte addresses through a TLB")
+    add_common(address_parser)
+    address_parser.add_argument("-a", "--algorithm", default="LRU", help="page replacement policy (default: LRU)")
+    address_parser.add_argument("-p", "--page-size", type=positive_int, required=True, help="page size in bytes")
+    address_parser.add_argument("-m", "--memory", type=positive_int,
+                                help="total memory in bytes; larger addresses are rejected")
+    address_parser.add_argument("--tlb-entries", type=positive_int, default=64, help="TLB entries (default: 64)")
+    address_parser.add_argument("--tlb-ways", type=positive_int,
+                                help="TLB associativity (default: fully associative)")
+    address_parser.add_argument("--tlb-policy", choices=TLB_POLICIES, default="LRU",
+                                help="TLB replacement policy (default: LRU)")
+    address_parser.add_argument("--tlb-time", type=float, default=TLB_TIME, help="TLB lookup time in ns")
+    address_parser.add_argument("--memory-time", type=float, default=MEMORY_TIME, help="memory access time in ns")
+    address_parser.add_argument("--fault-time", type=float, default=FAULT_TIME, help="page fault service time in ns")
+    address_parser.set_defaults(handler=address_command)
+
+    stream_parser = subparsers.add_parser("stream", help="follow a growing reference string on stdin")
+    stream_parser.add_argument("-f", "--frames", type=positive_int, required=True, help="number of memory frames")
+    stream_parser.add_argument("-a", "--algorithm", required=True,
+                               help="policy name; OPT needs the whole trace, use OPT (Lookahead) instead")
+    stream_parser.add_argument("--every", type=positive_count, default=10000,
+                               help="print the totals every this many references (default: 10000)")
+    stream_parser.add_argument("--lookahead", type=positive_int, default=LOOKAHEAD,
+                               help=f"lookahead window of OPT (Lookahead) (default: {LOOKAHEAD})")
+    stream_parser.set_defaults(handler=stream_command)
+
+    compare_parser = subparsers.add_parser("compare", help="compare every paging algorithm")
+    add_common(compare_parser)
+    compare_parser.add_argument("-c", "--criteria", choices=["Hit Ratio", "Miss Ratio"], default="Hit Ratio")
+    compare_parser.add_argument("--replicas", type=positive_int, default=1,
+                                help="run randomized policies this many times and report the mean, "
+                                     "standard deviation and 95%% confidence interval")
+    compare_parser.add_argument("--random-seed", type=int,
+                                help="seed for randomized policies (default: unseeded)")
+    compare_parser.add_argument("-j", "--workers", type=positive_int,
+                                help="worker processes for the runs and replicas (default: one per CPU)")
+    add_cache_option(compare_parser)
+    add_export_option(compare_parser, "comparison table")
+    add_profile_option(compare_parser)
+    compare_parser.set_defaults(handler=compare_command)
+
+    mrc_parser = subparsers.add_parser("mrc", help="miss ratio curve for every frame count up to --frames")
+    add_common(mrc_parser)
+    mrc_parser.add_argument("-a", "--algorithm", action="append",
+                            help="LRU or OPT, may be repeated (default: both)")
+    mrc_parser.set_defaults(handler=mrc_command)
+
+    sweep_parser = subparsers.add_parser("sweep", help="run algorithms x frame counts x traces on a process pool")
+    sweep_parser.add_argument("-f", "--frames", type=positive_int, nargs="+", required=True,
+                              help="frame counts to evaluate")
+    sweep_parser.add_argument("-r", "--reference",
+                              help="space separated reference string (read from stdin when omitted)")
+    sweep_parser.add_argument("-t", "--trace-file", action="append",
+                              help="trace file to include, may be repeated")
+    sweep_parser.add_argument("--format", choices=TRACE_FORMATS, default="text",
+                              help="format of the trace files")
+    add_workload_options(sweep_parser, repeatable=True)
+    sweep_parser.add_argument("-a", "--algorithm", action="append",
+                              help="algorithm to include, may be repeated (default: all)")
+    sweep_parser.add_argument("-j", "--workers", type=positive_int,
+                              help="worker processes (default: one per CPU)")
+    add_cache_option(sweep_parser)
+    add_export_option(sweep_parser, "result rows as they finish")
+    sweep_parser.set_defaults(handler=sweep_command)
+
+    multi_parser = subparsers.add_parser("multi", help="processes sharing memory under a scheduler")
+    multi_parser.add_argument("-f", "--frames", type=positive_int, required=True,
+                              help="physical frames shared by all processes")
+    multi_parser.add_argument("-t", "--trace-file", action="append",
+                              help="reference string of a process, may be repeated")
+    multi_parser.add_argument("--format", choices=TRACE_FORMATS, default="text",
+                              help="format of the trace files")
+    add_workload_options(multi_parser, repeatable=True)
+    multi_parser.add_argument("-n", "--processes", type=positive_int, default=1,
+                              help="processes per trace file or workload (default: 1)")
+    multi_parser.add_argument("-a", "--algorithm", default="LRU",
+                              help="policy of global and local replacement (default: LRU)")
+    multi_parser.add_argument("--replacement", choices=REPLACEMENTS, default="global",
+                              help="global or local replacement, or the working-set or PFF allocator "
+                                   "(default: global)")
+    multi_parser.add_argument("--allocation", choices=ALLOCATIONS, default="equal",
+                              help="frame allocation of local replacement (default: equal)")
+    multi_parser.add_argument("--quantum", type=positive_int, default=QUANTUM,
+                              help=f"references per time slice (default: {QUANTUM})")
+    multi_parser.add_argument("--weights", type=float, nargs="+",
+                              help="quantum weight of every process (default: round robin)")
+    multi_parser.add_argument("--fault-service", type=int, default=FAULT_SERVICE,
+                              help=f"references a faulting process waits (default: {FAULT_SERVICE})")
+    multi_parser.add_argument("--window", type=positive_int, default=WS_WINDOW,
+                              help=f"working-set window in references (default: {WS_WINDOW})")
+    multi_parser.add_argument("--pff-interval", type=positive_int, default=PFF_INTERVAL,
+                              help=f"references between faults below which PFF grows (default: {PFF_INTERVAL})")
+    multi_parser.add_argument("--thrash-window", type=positive_int, default=THRASH_WINDOW,
+                              help=f"ticks per interval checked for thrashing (default: {THRASH_WINDOW})")
+    multi_parser.add_argument("--random-seed", type=int, help="seed for randomized policies (default: unseeded)")
+    multi_parser.set_defaults(handler=multi_command)
+
+    bench_parser = subparsers.add_parser("bench", help="benchmark the policies on synthetic workloads")
+    bench_parser.add_argument("--sizes", type=positive_count, nargs="+",
+                              help="reference string lengths, e.g. 1e3 1e5 1e7 (default: 1e3 to 1e6)")
+    bench_parser.add_argument("-f", "--frames", type=positive_int, nargs="+",
+                              help="frame counts (default: 16 256 4096)")
+    bench_parser.add_argument("-a", "--algorithm", action="append",
+                              help="algorithm to include, may be repeated (default: all)")
+    bench_parser.add_argument("-w", "--workload", action="append", choices=BENCH_WORKLOADS,
+                              help="workload to include, may be repeated (default: all)")
+    bench_parser.add_argument("--record-trace", action="store_true",
+                              help="record the step trace instead of running stats-only")
+    bench_parser.add_argument("--no-memory", action="store_true",
+                              help="skip the traced run that measures peak memory")
+    bench_parser.add_argument("--repeat", type=positive_int, default=1,
+                              help="time each case this many times and keep the best")
+    bench_parser.add_argument("--seed", type=int, default=0, help="workload seed")
+    bench_parser.add_argument("--save", help="write the results to a JSON baseline file")
+    bench_parser.add_argument("--baseline", help="compare against a JSON baseline file")
+    bench_parser.add_argument("--tolerance", type=float, default=0.10,
+                              help="relative throughput change treated as noise (default: 0.10)")
+    bench_parser.set_defaults(handler=bench_command)
+
+    generate_parser = subparsers.add_parser("generate", help="write a synthetic workload to a trace file")
+    add_workload_options(generate_parser, required=True)
+    generate_parser.add_argument("-o", "--output", required=True, help="trace file to write")
+    generate_parser.add_argument("--format", choices=TRACE_FORMATS, default="int64",
+                                 help="trace file format (default: int64)")
+    generate_parser.set_defaults(handler=generate_command)
+
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    profile_path = getattr(args, "profile", None)
+    profiler = None
+    if profile_path and not profile_path.endswith(".json"):
+        import cProfile
+
+        profiler = cProfile.Profile()
+    try:
+        if profiler is not None:
+            profiler.enable()
+        try:
+            output = args.handler(args)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+        if profiler is not None:
+            profiler.dump_stats(profile_path)
+        elif profile_path:
+            with open(profile_path, "w") as f:
+                json.dump(output["performance"], f, indent=1)
+    except (OSError, ValueError) as e:
+        parser.exit(2, f"pagecontrol: error: {e}\n")
+    if output is not None:
+        json.dump(output, sys.stdout)
+        sys.stdout.write("\n")
+    return getattr(args, "exit_status", 0)
@@ -0,0 +1,79 @@
+import os
+
+from .cache import trace_fingerprint
+from .instrument import profile_run
+from .montecarlo import POOL_MIN_REFERENCES, monte_carlo
+from .policies import as_sequence
+from .registry import ALGORITHMS, POLICIES
+from .sweep import run_sweep
+
+
+# Run every algorithm on the same input and pick the best one for the criteria.
+# progress(done) counts references over all algorithms, i.e. up to len(ALGORITHMS) * len(trace).
+# With a ResultCache, runs already made on the same trace are not repeated. With record_trace the
+# cached runs also keep their step traces, so a later traced run of the same algorithm can reuse them.
+# The seed makes randomized policies reproducible. With replicas > 1 each randomized policy is
+# run as a Monte-Carlo batch: its row holds the mean over the replicas, and `spread` maps its
+# name to the monte_carlo() summary (standard deviation and confidence interval).
+# With on_stats, every single run is instrumented (bypassing the cache) and on_stats(stats) is
+# called with its profile_run() stats.
+# workers caps the processes used for pooled runs and Monte-Carlo replicas (default: one per CPU);
+# workers=1 runs everything in this process.
+def compare_algorithms(reference_string, num_frames, criteria="Hit Ratio", progress=None, cache=None,
+                       replicas=1, seed=None, workers=None, on_stats=None, record_trace=False):
+    reference_string = as_sequence(reference_string)
+    fingerprint = trace_fingerprint(reference_string) if cache is not None else None
+    results = []
+    spread = {}
+
+    # Plain stats-only runs go through run_sweep's process pool, as long as the trace is long
+    # enough to pay for starting it; the others run here one after another
+    pooled = {}
+    batch = [algo for algo in ALGORITHMS if not (replicas > 1 and POLICIES[algo].randomized)]
+    if (on_stats is None and not record_trace and len(batch) > 1 and (workers or os.cpu_count() or 1) > 1
+            and len(batch) * len(reference_string) >= POOL_MIN_REFERENCES):
+        for _, algo, _, hits, misses, hit_ratio, miss_ratio in run_sweep([reference_string], [num_frames], batch,
+                                                                          workers, cache, seed):
+            pooled[algo] = (algo, hits, misses, hit_ratio, miss_ratio)
+            if progress is not None:
+                progress(len(pooled) * len(reference_string))
+
+    finished = len(pooled)
+    for algo, paging in ALGORITHMS.items():
+        if algo in pooled:
+            results.append(pooled[algo])
+            continue
+        algo_progress = None
+        if progress is not None:
+            offset = finished * len(reference_string)
+            algo_progress = lambda done, offset=offset: progress(offset + done)
+        if replicas > 1 and POLICIES[algo].randomized:
+            estimate = monte_carlo(reference_string, num_frames, replicas, seed, algo, workers=workers,
+                                   progress=algo_progress)
+            spread[algo] = estimate
+            hits, misses, hit_ratio, miss_ratio = (estimate["hits"], estimate["misses"], estimate["hit_ratio"],
+                                                   estimate["miss_ratio"])
+        elif on_stats is not None:
+            (hits, misses, hit_ratio, miss_ratio, _), _ = profile_run(
+                algo, reference_string, num_frames, progress=algo_progress, seed=seed, on_stats=on_stats)
+        elif cache is not None:
+            hits, misses, hit_ratio, miss_ratio, _ = cache.run(algo, reference_string, num_frames, record_trace,
+                                                               progress=algo_progress, seed=seed,
+                                                               fingerprint=fingerprint)
+        else:
+            hits, misses, hit_ratio, miss_ratio, _ = paging(reference_string, num_frames, record_trace=False,
+                                                            progress=algo_progress, seed=seed)
+        results.append((algo, hits, misses, hit_ratio, miss_ratio))
+        finished += 1
+
+    # Determine the best algorithm based on the selected criteria
+    if criteria == "Hit Ratio":
+        best_algorithm = max(results, key=lambda x: x[3])  # x[3] is the hit ratio
+        best_metric = best_algorithm[3]
+        metric_name = "Hit Ratio"
+    else:
+        best_algorithm = min(results, key=lambda x: x[4])  # x[4] is the miss ratio
+        best_metric = best_algorithm[4]
+        metric_name = "Miss Ratio"
+
+    return results, best_algorithm, best_metric, metric_name, spread
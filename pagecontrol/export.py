@@ -0,0 +1,248 @@
+import csv
+import os
+import shutil
+import tempfile
+import zipfile
+from array import array
+from itertools import islice
+
+from .policies import PROGRESS_INTERVAL, as_sequence, optional_numpy, simulate
+from .registry import POLICIES, make_policy, resolve_algorithm
+from .sweep import SWEEP_COLUMNS
+from .trace import STEP_EVICT
+
+# Export formats by file extension
+EXPORT_FORMATS = {".csv": "csv", ".npz": "npz", ".parquet": "parquet"}
+
+# Columns of the exported tables as (name, type); "str" columns hold text
+# Step events: 1-based step number, page, STEP_* status code, evicted page (-1 when none)
+STEP_COLUMNS = [("step", "int64"), ("page", "int64"), ("status", "int8"), ("evicted", "int64")]
+# Comparison rows; hits and misses are means for Monte-Carlo rows, whose spread columns are NaN otherwise
+COMPARISON_COLUMNS = [("algorithm", "str"), ("hits", "float64"), ("misses", "float64"), ("hit_ratio", "float64"),
+                      ("miss_ratio", "float64"), ("hit_ratio_stddev", "float64"), ("hit_ratio_ci_low", "float64"),
+                      ("hit_ratio_ci_high", "float64")]
+SWEEP_TYPES = list(zip(SWEEP_COLUMNS, ["int64", "str", "int64", "int64", "int64", "float64", "float64"]))
+
+# Table rows buffered per written chunk
+ROW_CHUNK = 4096
+
+
+# CSV table with a header row; chunks are appended as they are written
+class CSVWriter:
+    def __init__(self, path, columns):
+        self.file = open(path, "w", newline="")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow([name for name, _ in columns])
+
+    def write(self, values):
+        self.writer.writerows(zip(*values))
+
+    def close(self):
+        self.file.close()
+
+    def abort(self):
+        self.file.close()
+
+
+# NumPy .npz archive with one array per column, loadable with np.load(path).
+# Each column is spilled to a temporary file as its chunks arrive, since a zip archive is written one
+# member at a time; close() copies them into uncompressed .npy members, so loads need no decoding.
+class NPZWriter:
+    def __init__(self, path, columns):
+        self.np = optional_numpy()
+        if self.np is None:
+            raise ValueError("Exporting to .npz needs NumPy.")
+        self.path = path
+        self.columns = columns
+        self.spills = [tempfile.TemporaryFile() for _ in columns]
+        self.widths = [0] * len(columns)  # Longest value of each text column
+        self.rows = 0
+
+    def write(self, values):
+        np = self.np
+        for index, ((_, kind), column) in enumerate(zip(self.columns, values)):
+            if kind == "str":
+                # Text goes out one value per line; its fixed width is only known at the end
+                self.widths[index] = max(self.widths[index], max(map(len, column), default=0))
+                self.spills[index].write("".join(f"{value}\n" for value in column).encode())
+            else:
+                self.spills[index].write(np.ascontiguousarray(column, dtype=kind).data)
+        self.rows += len(values[0])
+
+    def close(self):
+        np = self.np
+        try:
+            with zipfile.ZipFile(self.path, "w", zipfile.ZIP_STORED, allowZip64=True) as archive:
+                for (name, kind), spill, width in zip(self.columns, self.spills, self.widths):
+                    dtype = np.dtype(f"U{max(width, 1)}" if kind == "str" else kind)
+                    header = {"descr": np.lib.format.dtype_to_descr(dtype), "fortran_order": False,
+                              "shape": (self.rows,)}
+                    spill.seek(0)
+                    with archive.open(f"{name}.npy", "w", force_zip64=True) as member:
+                        np.lib.format.write_array_header_1_0(member, header)
+                        if kind == "str":
+                            lines = (line.decode()[:-1] for line in spill)
+                            while True:
+                                chunk = list(islice(lines, ROW_CHUNK))
+                                if not chunk:
+                                    break
+                                member.write(np.array(chunk, dtype=dtype).data)
+                        else:
+                            shutil.copyfileobj(spill, member)
+        finally:
+            self.abort()
+
+    def abort(self):
+        for spill in self.spills:
+            spill.close()
+
+
+# Parquet file with one row group per chunk
+class ParquetWriter:
+    def __init__(self, path, columns):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:  # pyarrow is optional; only needed for Parquet exports
+            raise ValueError("Exporting to Parquet needs pyarrow.") from None
+        self.pa = pa
+        self.np = optional_numpy()
+        types = {"str": pa.string(), "int8": pa.int8(), "int64": pa.int64(), "float64": pa.float64()}
+        self.schema = pa.schema([(name, types[kind]) for name, kind in columns])
+        self.writer = pq.ParquetWriter(path, self.schema)
+
+    def write(self, values):
+        pa, np = self.pa, self.np
+        arrays = [pa.array(column if np is None or field.type == pa.string() else np.asarray(column),
+                           type=field.type)
+                  for field, column in zip(self.schema, values)]
+        self.writer.write_table(pa.Table.from_arrays(arrays, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+    def abort(self):
+        self.writer.close()
+
+
+WRITERS = {"csv": CSVWriter, "npz": NPZWriter, "parquet": ParquetWriter}
+
+
+# Export format of a path, from its extension unless given
+def export_format(path, fmt=None):
+    if fmt is None:
+        fmt = EXPORT_FORMATS.get(os.path.splitext(path)[1].lower())
+        if fmt is None:
+            raise ValueError(f"Can't tell the export format of {path}: use a .csv, .npz or .parquet file.")
+    elif fmt not in WRITERS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    return fmt
+
+
+# Write chunks of column values (one sequence per column) to a file.
+# A failed or cancelled export doesn't leave a partial file behind.
+def write_chunks(path, columns, chunks, fmt=None):
+    writer = WRITERS[export_format(path, fmt)](path, columns)
+    try:
+        for values in chunks:
+            writer.write(values)
+        writer.close()
+    except BaseException:
+        writer.abort()
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+
+
+# Columns of the steps [start, stop) of a StepTrace, numbered from first_step
+def step_columns(trace, start, stop, first_step=1):
+    pages = trace.pages[start:stop]
+    status = trace.status[start:stop]
+    evicted = trace.evicted[start:stop]
+    steps = range(first_step + start, first_step + stop)
+    np = optional_numpy()
+    if np is not None:
+        status = np.frombuffer(status, dtype=np.int8)
+        evicted = np.where(status == STEP_EVICT, np.frombuffer(evicted, dtype=np.int64), -1)
+        steps = np.arange(steps.start, steps.stop, dtype=np.int64)
+        return steps, np.frombuffer(pages, dtype=np.int64), status, evicted
+    evicted = array("q", (page if code == STEP_EVICT else -1 for code, page in zip(status, evicted)))
+    return steps, pages, status, evicted
+
+
+def _trace_chunks(trace, progress):
+    for start in range(0, len(trace), PROGRESS_INTERVAL):
+        stop = min(len(trace), start + PROGRESS_INTERVAL)
+        yield step_columns(trace, start, stop)
+        if progress is not None:
+            progress(stop)
+
+
+# Export the step events of a recorded StepTrace.
+# progress(done) counts exported steps; it may raise SimulationCancelled.
+def export_steps(trace, path, fmt=None, progress=None):
+    if not len(trace):
+        raise ValueError("The trace has no steps to export.")
+    write_chunks(path, STEP_COLUMNS, _trace_chunks(trace, progress), fmt)
+
+
+# Run a registered policy and write its step events as the engine produces them, one chunk of
+# PROGRESS_INTERVAL references at a time, so the whole trace is never held in memory.
+# Returns (hits, misses, hit_ratio, miss_ratio, None) like a stats-only run.
+def stream_steps(algorithm, reference_string, num_frames, path, fmt=None, seed=None, progress=None):
+    algo = resolve_algorithm(algorithm)
+    if POLICIES[algo].requires_future:
+        reference_string = as_sequence(reference_string)
+    policy = make_policy(algo, num_frames, reference_string, seed)
+    references = iter(reference_string)
+    first = array("q", islice(references, PROGRESS_INTERVAL))
+    if not first:  # Checked before the file is created
+        raise ValueError("Reference string must not be empty.")
+    counts = [0, 0]
+
+    def chunks():
+        pages = first
+        while pages:
+            hits, misses, _, _, steps = simulate(policy, pages)
+            yield step_columns(steps, 0, len(steps), first_step=counts[0] + counts[1] + 1)
+            counts[0] += hits
+            counts[1] += misses
+            if progress is not None:
+                progress(counts[0] + counts[1])
+            pages = array("q", islice(references, PROGRESS_INTERVAL))
+
+    write_chunks(path, STEP_COLUMNS, chunks(), fmt)
+    hits, misses = counts
+    return hits, misses, hits / (hits + misses), misses / (hits + misses), None
+
+
+# Group table rows into chunks of columns
+def row_chunks(rows, chunk_size=ROW_CHUNK):
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        yield list(zip(*chunk))
+
+
+# Rows of a compare_algorithms() result, with the Monte-Carlo spread where there is one
+def comparison_rows(comparison):
+    results, _, _, _, spread = comparison
+    for algo, hits, misses, hit_ratio, miss_ratio in results:
+        estimate = spread.get(algo)
+        if estimate is None:
+            yield algo, hits, misses, hit_ratio, miss_ratio, float("nan"), float("nan"), float("nan")
+        else:
+            low, high = estimate["hit_ratio_ci"]
+            yield algo, hits, misses, hit_ratio, miss_ratio, estimate["hit_ratio_stddev"], low, high
+
+
+# Export the table of a compare_algorithms() result
+def export_comparison(comparison, path, fmt=None):
+    write_chunks(path, COMPARISON_COLUMNS, row_chunks(comparison_rows(comparison)), fmt)
+
+
+# Export run_sweep() rows, writing them in chunks as the sweep yields them
+def export_sweep(rows, path, fmt=None):
+    write_chunks(path, SWEEP_TYPES, row_chunks(rows), fmt)
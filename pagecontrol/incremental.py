@@ -0,0 +1,138 @@
+import copy
+import hashlib
+from array import array
+
+from .cache import trace_fingerprint
+from .policies import LOOKAHEAD, PROGRESS_INTERVAL, as_sequence, simulate
+from .registry import POLICIES, make_policy, resolve_algorithm
+from .trace import StepTrace
+
+
+# Simulation that resumes when references are appended to its reference string.
+# The policy engine is kept between calls - frames, recency and queue structures, counters and
+# the Random generator - so extending the trace only processes the new references.
+# Online engines with a feed() method (OPT (Lookahead)) only make a step final once its lookahead
+# window is full; the steps still waiting are simulated on a snapshot of the engine, so results
+# always cover the whole trace. Engines that need the complete future (exact Optimal) can't
+# resume and are re-run from the start.
+# Resumable engines never look at final references again, so those are let go of and only kept as
+# a running fingerprint, which is all extends() needs; following a stream takes bounded memory.
+class IncrementalSimulation:
+    def __init__(self, algorithm, num_frames, record_trace=True, seed=None, lookahead=LOOKAHEAD):
+        self.algorithm = resolve_algorithm(algorithm)
+        self.num_frames = num_frames
+        self.record_trace = record_trace
+        self.seed = seed
+        self.lookahead = lookahead
+        policy_class = POLICIES[self.algorithm]
+        self.online = hasattr(policy_class, "feed")
+        self.resumable = self.online or not policy_class.requires_future
+        self.reset()
+
+    def __len__(self):
+        return self.dropped + len(self.references)
+
+    def reset(self):
+        self.references = array("q")  # References from `dropped` on
+        self.dropped = 0  # Final references let go of
+        self.digest = hashlib.blake2b(digest_size=16)  # trace_fingerprint() of the dropped references
+        self.policy = None
+        self.done = 0  # References whose steps are final
+        self.hits = 0
+        self.misses = 0
+        self.pending = None  # (hits, misses) of the steps simulated on a snapshot
+        self.trace = None
+        if self.record_trace:
+            self.trace = StepTrace(self.num_frames, reorder_on_hit=POLICIES[self.algorithm].reorder_on_hit)
+
+    def _new_policy(self):
+        if self.online:
+            return POLICIES[self.algorithm](self.num_frames, lookahead=self.lookahead)
+        return make_policy(self.algorithm, self.num_frames, self.references, self.seed)
+
+    # Process appended references and return (hits, misses, hit_ratio, miss_ratio, trace) for the
+    # whole trace. progress(done) counts the new references; it may raise SimulationCancelled,
+    # which leaves the simulation resumable at the last finished chunk.
+    def extend(self, pages, progress=None):
+        start = len(self)
+        self.references.extend(pages)
+        if len(self) == start and self.policy is not None:
+            return self.result()
+
+        if self.pending is not None:
+            self.pending = None
+            if self.trace is not None:
+                self.trace.truncate(self.done)
+        if not self.resumable or self.policy is None:
+            references = self.references
+            self.reset()
+            self.references = references
+            self.policy = self._new_policy()
+        if self.online:
+            self.policy.feed(self.references[start - self.dropped:])
+
+        end = len(self)
+        if self.online:
+            end = max(self.done, end - self.lookahead)
+        first = self.done
+        while self.done < end:
+            stop = min(end, self.done + PROGRESS_INTERVAL)
+            chunk = self.references[self.done - self.dropped:stop - self.dropped]
+            hits, misses, _, _, steps = simulate(self.policy, chunk, self.record_trace)
+            self.hits += hits
+            self.misses += misses
+            if steps is not None:
+                self.trace.extend(steps)
+            self.done = stop
+            if progress is not None:
+                progress(stop - first)
+        if self.resumable:
+            self._drop()
+        return self.result()
+
+    # Fold the final references into the running fingerprint
+    def _drop(self):
+        final = self.done - self.dropped
+        self.digest.update(self.references[:final])
+        del self.references[:final]
+        self.dropped = self.done
+
+    # Whether a reference string starts with every reference processed so far
+    def extends(self, reference_string):
+        reference_string = as_sequence(reference_string)
+        if len(reference_string) < len(self):
+            return False
+        kept = reference_string[self.dropped:len(self)]
+        if not isinstance(kept, array) or kept.typecode != "q":
+            kept = array("q", kept)
+        if kept != self.references:
+            return False
+        return not self.dropped or trace_fingerprint(reference_string[:self.dropped]) == self.digest.hexdigest()
+
+    # Re-run on a reference string: when it only extends the current one, just the new references
+    # are processed, otherwise the simulation starts over
+    def update(self, reference_string, progress=None):
+        reference_string = as_sequence(reference_string)
+        known = len(self)
+        if not self.extends(reference_string):
+            self.reset()
+            known = 0
+        return self.extend(reference_string[known:], progress)
+
+    def result(self):
+        total = len(self)
+        if total == 0:
+            raise ValueError("Reference string must not be empty.")
+        hits = self.hits
+        misses = self.misses
+        if self.done < total:
+            if self.pending is None:
+                # The engine itself must not see them yet, so they run on a copy
+                snapshot = copy.deepcopy(self.policy)
+                tail = simulate(snapshot, self.references[self.done - self.dropped:], self.record_trace)
+                self.pending = tail[:2]
+                if self.trace is not None:
+                    self.trace.extend(tail[4])
+            hits += self.pending[0]
+            misses += self.pending[1]
+        return hits, misses, hits / total, misses / total, self.trace
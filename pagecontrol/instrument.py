@@ -0,0 +1,89 @@
+import time
+
+from .policies import as_sequence, simulate
+from .registry import POLICIES, make_policy, resolve_algorithm
+
+# Accesses between two samples of the engine's structure sizes
+SAMPLE_INTERVAL = 1024
+
+
+# Policy engine wrapper that measures what a run costs.
+# Every access is timed; the time of the accesses that had to evict goes to victim selection.
+# The sizes of the engine's containers (frames, queues, heaps, ghost lists, ...) are sampled
+# every SAMPLE_INTERVAL accesses to track their peaks.
+class InstrumentedPolicy:
+    def __init__(self, policy):
+        self.policy = policy
+        self.num_frames = policy.num_frames
+        self.reorder_on_hit = policy.reorder_on_hit
+        self.requires_future = policy.requires_future
+        self.randomized = policy.randomized
+        self.accesses = 0
+        self.evictions = 0
+        self.access_seconds = 0.0
+        self.victim_seconds = 0.0
+        self.peak_structures = {}
+
+    def access(self, page):
+        start = time.perf_counter()
+        result = self.policy.access(page)
+        elapsed = time.perf_counter() - start
+        self.access_seconds += elapsed
+        if result[1] is not None:
+            self.evictions += 1
+            self.victim_seconds += elapsed
+        self.accesses += 1
+        if self.accesses % SAMPLE_INTERVAL == 0:
+            self.sample_structures()
+        return result
+
+    def frames(self):
+        return self.policy.frames()
+
+    # Record the size of every container the engine holds
+    def sample_structures(self):
+        peaks = self.peak_structures
+        for name, value in vars(self.policy).items():
+            if hasattr(value, "__len__") and not isinstance(value, (str, bytes)):
+                size = len(value)
+                if size > peaks.get(name, -1):
+                    peaks[name] = size
+
+
+# Run a registered policy with instrumentation.
+# Returns the usual (hits, misses, hit_ratio, miss_ratio, trace) result and a stats dict: wall
+# time, time to build the engine (Optimal's next-use index), references per second, evictions,
+# time spent in accesses that selected a victim (and its share of the access time), and the peak
+# size of each of the engine's structures. Timing every access slows the run down, so compare
+# the numbers with each other rather than with plain runs.
+# on_stats(stats) is called with the stats once the run has finished.
+def profile_run(algorithm, reference_string, num_frames, record_trace=False, progress=None, seed=None,
+                on_stats=None):
+    algo = resolve_algorithm(algorithm)
+    if POLICIES[algo].requires_future:
+        reference_string = as_sequence(reference_string)
+
+    start = time.perf_counter()
+    policy = InstrumentedPolicy(make_policy(algo, num_frames, reference_string, seed))
+    setup_seconds = time.perf_counter() - start
+    result = simulate(policy, reference_string, record_trace, progress)
+    seconds = time.perf_counter() - start
+    policy.sample_structures()
+
+    references = result[0] + result[1]
+    stats = {
+        "algorithm": algo,
+        "frames": num_frames,
+        "references": references,
+        "seconds": seconds,
+        "setup_seconds": setup_seconds,
+        "refs_per_sec": references / seconds if seconds else float("inf"),
+        "evictions": policy.evictions,
+        "access_seconds": policy.access_seconds,
+        "victim_seconds": policy.victim_seconds,
+        "victim_share": policy.victim_seconds / policy.access_seconds if policy.access_seconds else 0.0,
+        "peak_structures": policy.peak_structures,
+    }
+    if on_stats is not None:
+        on_stats(stats)
+    return result, stats
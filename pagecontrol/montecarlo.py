@@ -0,0 +1,148 @@
+import os
+import random
+import statistics
+
+from .policies import RandomPolicy, as_sequence, optional_numpy
+from .registry import POLICIES, resolve_algorithm, run_policy
+from .sweep import _attach_trace, share_trace
+
+# Below this many replicas a vectorized step costs more than running the replicas one by one
+VECTOR_MIN_REPLICAS = 32
+
+# Largest pages x replicas table the vectorized Random engine may allocate (int32 cells)
+VECTOR_MAX_CELLS = 1 << 25
+
+# Below this many references in total, starting worker processes costs more than it saves
+POOL_MIN_REFERENCES = 1 << 20
+
+# Random draws generated per block in the vectorized engine
+DRAW_BLOCK = 4096
+
+
+# One seed per replica, all derived from the batch seed so the whole batch is reproducible
+def replica_seeds(seed, replicas):
+    rng = random.Random(seed)
+    return [rng.getrandbits(64) for _ in range(replicas)]
+
+
+# Misses of every replica of Random replacement, simulated together with NumPy.
+# All replicas see the same references and fill their frames identically, so only the victim
+# choices differ: each step checks the page's slot in every replica at once (a pages x replicas
+# table, -1 when not resident) and evicts a random slot in the replicas that missed.
+def _vectorized_random_misses(reference_string, num_frames, replicas, seed, progress=None):
+    np = optional_numpy()
+    rng = np.random.default_rng(seed)
+    _, pages = np.unique(np.asarray(reference_string, dtype=np.int64), return_inverse=True)
+    slot_of = np.full((int(pages.max()) + 1, replicas), -1, dtype=np.int32)
+    frames = np.empty((replicas, num_frames), dtype=np.int32)
+    misses = np.zeros(replicas, dtype=np.int64)
+    filled = 0
+
+    for start in range(0, len(pages), DRAW_BLOCK):
+        chunk = pages[start:start + DRAW_BLOCK].tolist()
+        draws = rng.integers(0, num_frames, size=(len(chunk), replicas), dtype=np.int32)
+        for step, page in enumerate(chunk):
+            slots = slot_of[page]
+            if filled < num_frames:
+                # Still filling free frames - the same in every replica
+                if slots[0] < 0:
+                    slots[:] = filled
+                    frames[:, filled] = page
+                    filled += 1
+                    misses += 1
+                continue
+            missed = np.flatnonzero(slots < 0)
+            if missed.size:
+                victim_slots = draws[step, missed]
+                slot_of[frames[missed, victim_slots], missed] = -1
+                frames[missed, victim_slots] = page
+                slots[missed] = victim_slots
+                misses[missed] += 1
+        if progress is not None:
+            progress(start + len(chunk))
+    return misses.tolist()
+
+
+def _run_replicas(name, length, algo, num_frames, seeds):
+    reference_string = _attach_trace(name, length)
+    return [run_policy(algo, reference_string, num_frames, record_trace=False, seed=seed)[1] for seed in seeds]
+
+
+# Misses of every replica, run one by one or spread over a process pool in batches
+def _replica_misses(reference_string, algo, num_frames, seeds, workers=None, progress=None):
+    length = len(reference_string)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(seeds) == 1 or length * len(seeds) < POOL_MIN_REFERENCES:
+        misses = []
+        for seed in seeds:
+            misses.append(run_policy(algo, reference_string, num_frames, record_trace=False, seed=seed)[1])
+            if progress is not None:
+                progress(length * len(misses) // len(seeds))
+        return misses
+
+    from concurrent.futures import ProcessPoolExecutor, as_completed  # Loads multiprocessing
+
+    block, length = share_trace(reference_string)
+    try:
+        batches = [seeds[start::workers] for start in range(min(workers, len(seeds)))]
+        misses = []
+        with ProcessPoolExecutor(max_workers=len(batches)) as pool:
+            futures = [pool.submit(_run_replicas, block.name, length, algo, num_frames, batch) for batch in batches]
+            try:
+                for future in as_completed(futures):
+                    misses.extend(future.result())
+                    if progress is not None:
+                        progress(length * len(misses) // len(seeds))
+            finally:
+                for future in futures:
+                    future.cancel()
+        return misses
+    finally:
+        block.close()
+        block.unlink()
+
+
+# Run `replicas` independent seeded replicas of a randomized policy and summarise their hit ratios.
+# Random replacement with NumPy installed runs all replicas as one vectorized batch; otherwise
+# (or for other randomized policies) replicas run one by one, or over `workers` processes for
+# long traces. progress(done) counts up to len(reference_string).
+# Returns a dict with the mean hits/misses/ratios, the standard deviation of the hit ratio and
+# a normal-approximation confidence interval for its mean.
+def monte_carlo(reference_string, num_frames, replicas=100, seed=0, algorithm="Random (RAND)", confidence=0.95,
+                workers=None, progress=None):
+    algo = resolve_algorithm(algorithm)
+    if replicas <= 0:
+        raise ValueError("Replicas must be a positive integer.")
+    if not 0 < confidence < 1:
+        raise ValueError("Confidence must be between 0 and 1.")
+    reference_string = as_sequence(reference_string)
+    total = len(reference_string)
+    if total == 0:
+        raise ValueError("Reference string must not be empty.")
+
+    vectorized = (POLICIES[algo] is RandomPolicy and replicas >= VECTOR_MIN_REPLICAS
+                  and len(set(reference_string)) * replicas <= VECTOR_MAX_CELLS and optional_numpy() is not None)
+    if vectorized:
+        misses = _vectorized_random_misses(reference_string, num_frames, replicas, seed, progress)
+    else:
+        misses = _replica_misses(reference_string, algo, num_frames, replica_seeds(seed, replicas), workers,
+                                 progress)
+
+    hit_ratios = [(total - count) / total for count in misses]
+    mean = statistics.fmean(hit_ratios)
+    stddev = statistics.stdev(hit_ratios) if replicas > 1 else 0.0
+    margin = statistics.NormalDist().inv_cdf(0.5 + confidence / 2) * stddev / replicas ** 0.5
+    mean_misses = statistics.fmean(misses)
+    return {
+        "algorithm": algo,
+        "replicas": replicas,
+        "seed": seed,
+        "hits": total - mean_misses,
+        "misses": mean_misses,
+        "hit_ratio": mean,
+        "miss_ratio": 1 - mean,
+        "hit_ratio_stddev": stddev,
+        "confidence": confidence,
+        "hit_ratio_ci": (max(0.0, mean - margin), min(1.0, mean + margin)),
+        "vectorized": vectorized,
+    }
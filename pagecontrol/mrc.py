@@ -0,0 +1,154 @@
+from .policies import PROGRESS_INTERVAL, as_sequence, next_use_index
+from .registry import resolve_algorithm
+
+# Only stack algorithms have an inclusion property, so only they get a single-pass curve
+STACK_ALGORITHMS = ["LRU", "Optimal (OPT)"]
+
+
+# LRU stack distance histogram (Mattson) in O(n log n).
+# A Fenwick tree over time marks the last reference of every page; the stack distance of a
+# re-reference is the number of distinct pages touched since the previous one, plus one.
+# Returns hist where hist[d] counts references at stack distance d (1 <= d <= max_frames).
+# progress(done) is called every PROGRESS_INTERVAL references; it may raise SimulationCancelled.
+def lru_stack_histogram(reference_string, max_frames, progress=None):
+    reference_string = as_sequence(reference_string)
+    n = len(reference_string)
+    tree = [0] * (n + 1)
+    hist = [0] * (max_frames + 1)
+    last_seen = {}
+
+    for t, page in enumerate(reference_string, start=1):
+        previous = last_seen.get(page)
+        if previous is not None:
+            # Markers after `previous` = distinct pages referenced since then
+            marked = 0
+            i = previous
+            while i > 0:
+                marked += tree[i]
+                i -= i & -i
+            distance = len(last_seen) - marked + 1
+            if distance <= max_frames:
+                hist[distance] += 1
+            i = previous
+            while i <= n:
+                tree[i] -= 1
+                i += i & -i
+        last_seen[page] = t
+        i = t
+        while i <= n:
+            tree[i] += 1
+            i += i & -i
+        if progress is not None and t % PROGRESS_INTERVAL == 0:
+            progress(t)
+
+    return hist
+
+
+# OPT stack distance histogram using Mattson's priority stack, where a page's priority is
+# its next use. Only the top max_frames entries matter for caches of up to max_frames frames,
+# so the stack is cut at that depth: one pass replaces max_frames OPT runs.
+# When the referenced page moves to the top, the pages above its old level sink: each level keeps
+# the page needed sooner, so only the levels holding a new latest-next-use record change, and the
+# record moves down to the next one. A max segment tree over the levels' next uses finds each record
+# in O(log max_frames), so a reference costs O((records + 1) log max_frames) instead of its depth.
+# progress(done) is called as for lru_stack_histogram.
+def opt_stack_histogram(reference_string, max_frames, progress=None):
+    reference_string = as_sequence(reference_string)
+    next_use = next_use_index(reference_string)
+    hist = [0] * (max_frames + 1)
+    size = 1
+    while size < max_frames:
+        size *= 2
+    tree = [-1] * (2 * size)  # Latest next use under each node, leaves from `size`; -1 for empty levels
+    stack = [None] * max_frames
+    level_of = {}  # page -> its level in the stack
+    used = 0  # Levels holding a page
+
+    def place(level, page, use):
+        stack[level] = page
+        level_of[page] = level
+        node = level + size
+        tree[node] = use
+        node >>= 1
+        while node:
+            later = tree[2 * node]
+            if tree[2 * node + 1] > later:
+                later = tree[2 * node + 1]
+            if tree[node] == later:
+                break
+            tree[node] = later
+            node >>= 1
+
+    for i, page in enumerate(reference_string):
+        depth = level_of.get(page)
+        if depth is None:
+            depth = used
+            if used < max_frames:
+                used += 1
+        else:
+            hist[depth + 1] += 1
+
+        if depth:
+            carry = stack[0]
+            carry_use = tree[size]
+            level = 1
+            while level < depth:
+                # Next level at or below `level` whose page is needed later than the carried one
+                node = level + size
+                while tree[node] <= carry_use:
+                    while node & 1:
+                        node >>= 1
+                    if not node:
+                        break
+                    node += 1
+                if not node:
+                    break
+                while node < size:
+                    node *= 2
+                    if tree[node] <= carry_use:
+                        node += 1
+                level = node - size
+                if level >= depth:
+                    break
+                displaced = stack[level]
+                displaced_use = tree[node]
+                place(level, carry, carry_use)
+                carry, carry_use = displaced, displaced_use
+                level += 1
+            if depth < max_frames:
+                place(depth, carry, carry_use)
+            else:
+                del level_of[carry]  # Sank below the deepest level that matters
+        place(0, page, next_use[i])
+
+        if progress is not None and (i + 1) % PROGRESS_INTERVAL == 0:
+            progress(i + 1)
+
+    return hist
+
+
+# Hits, misses and ratios for every frame count 1..max_frames from a single pass over the trace.
+# Returns a list of (num_frames, hits, misses, hit_ratio, miss_ratio) tuples.
+# progress(done) counts references of the pass; it may raise SimulationCancelled.
+def miss_ratio_curve(reference_string, max_frames, algorithm="LRU", progress=None):
+    algo = resolve_algorithm(algorithm)
+    if algo not in STACK_ALGORITHMS:
+        raise ValueError(f"{algo} is not a stack algorithm, so it has no single-pass miss ratio curve.")
+    if max_frames <= 0:
+        raise ValueError("Frames must be a positive integer.")
+
+    reference_string = as_sequence(reference_string)
+    total = len(reference_string)
+    if total == 0:
+        raise ValueError("Reference string must not be empty.")
+    if algo == "LRU":
+        hist = lru_stack_histogram(reference_string, max_frames, progress)
+    else:
+        hist = opt_stack_histogram(reference_string, max_frames, progress)
+
+    curve = []
+    hits = 0
+    for num_frames in range(1, max_frames + 1):
+        hits += hist[num_frames]
+        curve.append((num_frames, hits, total - hits, hits / total, (total - hits) / total))
+    return curve
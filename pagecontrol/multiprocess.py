@@ -0,0 +1,425 @@
+from collections import OrderedDict
+from heapq import heappop, heappush
+
+from .montecarlo import replica_seeds
+from .policies import PROGRESS_INTERVAL, as_sequence
+from .registry import POLICIES, make_policy, resolve_algorithm
+
+# Multi-process mode: several per-process reference strings share the physical frames. A
+# scheduler interleaves them in time slices; a process that faults waits for the page while the
+# CPU runs the next ready process. Time is counted in references: one reference takes one tick.
+
+# How frames are shared between the processes:
+# global - one policy engine over the pages of all processes, a fault may take any process's frame
+# local - one engine per process over a fixed allocation (see ALLOCATIONS)
+# working-set - each process keeps the pages it used in its last `window` references
+# pff - page-fault frequency: a process grows on frequent faults and drops the pages it hasn't
+#       used since its last fault when faults are rarer than one per `pff_interval` references
+# Under working-set and pff, a fault that finds no free frame triggers load control: a PFF process
+# past its fault-frequency target is shrunk first, and failing that another process is suspended,
+# giving up all its frames, until enough frames are free to hold the resident set it had.
+REPLACEMENTS = ["global", "local", "working-set", "pff"]
+
+# Fixed allocations of local replacement: the same share for every process, or a share
+# proportional to the number of distinct pages the process touches
+ALLOCATIONS = ["equal", "proportional"]
+
+# References a process runs per time slice (multiplied by its weight with weighted quanta)
+QUANTUM = 100
+
+# Ticks a process waits for a faulting page
+FAULT_SERVICE = 1000
+
+# Working-set window and PFF threshold, in references of the process itself
+WS_WINDOW = 1000
+PFF_INTERVAL = 100
+
+# Length of the intervals checked for thrashing, and the CPU utilization an interval must reach
+THRASH_WINDOW = 100000
+THRASH_UTILIZATION = 0.5
+
+
+# Global replacement - the engine sees (process, page) pairs
+class GlobalMemory:
+    def __init__(self, policy, processes):
+        self.policy = policy
+        self.resident = [0] * processes
+        self.evictions = [0] * processes  # Frames taken from each process
+
+    def access(self, pid, page, vtime):
+        hit, evicted = self.policy.access((pid, page))
+        if hit:
+            return True
+        self.resident[pid] += 1
+        if evicted is not None:
+            self.resident[evicted[0]] -= 1
+            self.evictions[evicted[0]] += 1
+        return False
+
+    # A finished process keeps its pages until other processes need the frames
+    def release(self, pid):
+        pass
+
+
+# Local replacement - one engine per process, each with its own frames
+class LocalMemory:
+    def __init__(self, policies):
+        self.policies = policies
+        self.resident = [0] * len(policies)
+        self.evictions = [0] * len(policies)
+
+    def access(self, pid, page, vtime):
+        hit, evicted = self.policies[pid].access(page)
+        if hit:
+            return True
+        if evicted is None:
+            self.resident[pid] += 1
+        else:
+            self.evictions[pid] += 1
+        return False
+
+    def release(self, pid):
+        pass
+
+
+# Resident sets of variable size drawn from a shared pool of frames.
+# Each set maps page -> last use (the process's own reference count), least recently used first.
+# Suspended processes hold no frames and wait in `swapped`, oldest first, for room to come back.
+class _ResidentSets:
+    def __init__(self, num_frames, processes):
+        self.free = num_frames
+        self.sets = [OrderedDict() for _ in range(processes)]
+        self.resident = [0] * processes
+        self.evictions = [0] * processes
+        self.steals = 0  # Faults that found no free frame
+        self.suspended = [False] * processes
+        self.demand = [0] * processes  # Frames a suspended process held, needed to resume it
+        self.swapped = []
+        self.suspensions = [0] * processes
+
+    def _drop_oldest(self, pid):
+        self.sets[pid].popitem(last=False)
+        self.resident[pid] -= 1
+        self.evictions[pid] += 1
+        self.free += 1
+
+    # Free frames for other processes' faults; overridden by allocators that can shrink a process
+    def _reclaim(self, pid):
+        pass
+
+    # Frame for a fault of pid: a free one, else one reclaimed from a process over its target, else
+    # the frames of the other process holding the most, which is suspended. A process that holds
+    # every frame by itself replaces its own least recently used page.
+    def _take_frame(self, pid):
+        if not self.free:
+            self.steals += 1
+            self._reclaim(pid)
+        if not self.free:
+            victim = max((other for other in range(len(self.sets)) if other != pid and self.sets[other]),
+                         key=lambda other: len(self.sets[other]), default=None)
+            if victim is None:
+                self._drop_oldest(pid)
+            else:
+                self._suspend(victim)
+        self.free -= 1
+        self.resident[pid] += 1
+
+    def _suspend(self, pid):
+        self.demand[pid] = len(self.sets[pid])
+        self.evictions[pid] += len(self.sets[pid])
+        self.release(pid)
+        self.suspended[pid] = True
+        self.suspensions[pid] += 1
+        self.swapped.append(pid)
+
+    # Processes to resume, oldest suspension first, while the free frames hold what they had.
+    # With force, the oldest one comes back regardless, for when nothing else can run.
+    def resume(self, force=False):
+        resumed = []
+        available = self.free
+        while self.swapped and (force or self.demand[self.swapped[0]] <= available):
+            pid = self.swapped.pop(0)
+            self.suspended[pid] = False
+            available -= self.demand[pid]
+            resumed.append(pid)
+            force = False
+        return resumed
+
+    # A finished process gives all its frames back
+    def release(self, pid):
+        self.free += len(self.sets[pid])
+        self.sets[pid].clear()
+        self.resident[pid] = 0
+
+
+# Working-set allocator (Denning) - a process holds exactly the pages it referenced in its last
+# `window` references
+class WorkingSetMemory(_ResidentSets):
+    def __init__(self, num_frames, processes, window=WS_WINDOW):
+        super().__init__(num_frames, processes)
+        self.window = window
+
+    def access(self, pid, page, vtime):
+        pages = self.sets[pid]
+        hit = page in pages
+        if hit:
+            pages.move_to_end(page)
+        else:
+            self._take_frame(pid)
+        pages[page] = vtime
+
+        # Pages last used `window` or more references ago leave the working set
+        expired = vtime - self.window
+        while pages[next(iter(pages))] <= expired:
+            self._drop_oldest(pid)
+        return hit
+
+
+# Page-fault frequency allocator (Chu & Opderbeck) - on a fault, a process that faulted within
+# the last `interval` references just grows; otherwise it first drops every page it hasn't
+# used since its previous fault
+class PFFMemory(_ResidentSets):
+    def __init__(self, num_frames, processes, interval=PFF_INTERVAL):
+        super().__init__(num_frames, processes)
+        self.interval = interval
+        self.last_fault = [0] * processes
+        self.vtime = [0] * processes  # Each process's reference count at its latest access
+
+    def access(self, pid, page, vtime):
+        self.vtime[pid] = vtime
+        pages = self.sets[pid]
+        if page in pages:
+            pages.move_to_end(page)
+            pages[page] = vtime
+            return True
+
+        if vtime - self.last_fault[pid] > self.interval:
+            self._shrink(pid)
+        self.last_fault[pid] = vtime
+        self._take_frame(pid)
+        pages[page] = vtime
+        return False
+
+    # Drop every page the process hasn't used since its previous fault
+    def _shrink(self, pid):
+        pages = self.sets[pid]
+        last_fault = self.last_fault[pid]
+        while pages and pages[next(iter(pages))] < last_fault:
+            self._drop_oldest(pid)
+
+    # Shrink the other processes whose faults were rarer than one per interval when they last ran
+    def _reclaim(self, pid):
+        for other, pages in enumerate(self.sets):
+            if other != pid and pages and self.vtime[other] - self.last_fault[other] > self.interval:
+                self._shrink(other)
+
+
+# Split num_frames into one allocation per process in proportion to sizes: every process gets
+# one frame, the rest is shared out by largest remainder
+def allocate_frames(num_frames, sizes):
+    if num_frames < len(sizes):
+        raise ValueError("Local replacement needs at least one frame per process.")
+    spare = num_frames - len(sizes)
+    total = sum(sizes)
+    frames = [1 + spare * size // total for size in sizes]
+    by_remainder = sorted(range(len(sizes)), key=lambda pid: spare * sizes[pid] % total, reverse=True)
+    for pid in by_remainder[:num_frames - sum(frames)]:
+        frames[pid] += 1
+    return frames
+
+
+# Busy ticks [start, start + length) added to the per-interval [busy, faults, refaults] counters
+def _add_busy(intervals, start, length, window):
+    while length:
+        index = start // window
+        while len(intervals) <= index:
+            intervals.append([0, 0, 0])
+        run = min(length, (index + 1) * window - start)
+        intervals[index][0] += run
+        start += run
+        length -= run
+
+
+# Run per-process reference strings against num_frames shared frames.
+# The scheduler is an event heap of (ready time, queue order, process): the next slice goes to the
+# process that became ready first, and processes ready at the same time run in round-robin order.
+# Each slice runs up to quantum references (quantum * weight with weights) and ends early on a
+# page fault, after which the process is ready again fault_service ticks later.
+# progress(done) counts references over all processes.
+# Returns a dict with system-wide and per-process ("per_process") references, faults and fault
+# rates, frame usage, finish times, CPU utilization and thrashing. Refaults are faults on pages
+# the process had loaded before, i.e. faults caused by too few frames rather than first touches.
+# An interval of thrash_window ticks thrashes when processes waiting on faults leave the CPU busy
+# less than THRASH_UTILIZATION of it and most of its faults are refaults; the run thrashes when
+# most of its intervals do.
+def simulate_processes(traces, num_frames, algorithm="LRU", replacement="global", allocation="equal",
+                       quantum=QUANTUM, weights=None, fault_service=FAULT_SERVICE, window=WS_WINDOW,
+                       pff_interval=PFF_INTERVAL, thrash_window=THRASH_WINDOW, seed=None, progress=None):
+    traces = [as_sequence(trace) for trace in traces]
+    if not traces:
+        raise ValueError("At least one process trace is needed.")
+    if any(len(trace) == 0 for trace in traces):
+        raise ValueError("Process reference strings must not be empty.")
+    if num_frames <= 0 or quantum <= 0 or window <= 0 or pff_interval <= 0 or thrash_window <= 0:
+        raise ValueError("Frames, quantum, window and intervals must be positive integers.")
+    if fault_service < 0:
+        raise ValueError("Fault service time must not be negative.")
+    if replacement not in REPLACEMENTS:
+        raise ValueError(f"Unknown replacement: {replacement} (expected one of {', '.join(REPLACEMENTS)})")
+    if allocation not in ALLOCATIONS:
+        raise ValueError(f"Unknown allocation: {allocation} (expected one of {', '.join(ALLOCATIONS)})")
+    count = len(traces)
+    if weights is None:
+        weights = [1] * count
+    if len(weights) != count or any(weight <= 0 for weight in weights):
+        raise ValueError("Give one positive weight per process.")
+    quanta = [max(1, round(quantum * weight)) for weight in weights]
+
+    algo = None
+    allocations = None
+    if replacement in ("global", "local"):
+        algo = resolve_algorithm(algorithm)
+        if POLICIES[algo].requires_future:
+            raise ValueError(f"{algo} needs the whole reference string in advance, but the scheduler only "
+                             f"decides the interleaving as it runs.")
+    if replacement == "global":
+        memory = GlobalMemory(make_policy(algo, num_frames, seed=seed), count)
+    elif replacement == "local":
+        sizes = [1] * count if allocation == "equal" else [len(set(trace)) for trace in traces]
+        allocations = allocate_frames(num_frames, sizes)
+        seeds = replica_seeds(seed, count) if seed is not None else [None] * count
+        memory = LocalMemory([make_policy(algo, frames, seed=process_seed)
+                              for frames, process_seed in zip(allocations, seeds)])
+    elif replacement == "working-set":
+        memory = WorkingSetMemory(num_frames, count, window)
+    else:
+        memory = PFFMemory(num_frames, count, pff_interval)
+
+    access = memory.access
+    resident = memory.resident
+    positions = [0] * count
+    faults = [0] * count
+    refaults = [0] * count
+    touched = [set() for _ in range(count)]  # Pages each process has faulted in
+    peak_frames = [0] * count
+    frame_ticks = [0] * count  # Resident frames summed over the process's references
+    finish = [0] * count
+    intervals = []  # [busy ticks, faults, refaults] per thrash_window interval
+    done = 0
+    next_report = PROGRESS_INTERVAL
+
+    heap = [(0, pid, pid) for pid in range(count)]
+    order = count
+    now = 0
+    suspended = getattr(memory, "suspended", None)
+    parked = set()  # Suspended processes taken off the heap until they are resumed
+    while heap or parked:
+        if not heap:
+            # Every process left is suspended: bring one back even without room for all its pages
+            for pid in memory.resume(force=True):
+                parked.discard(pid)
+                heappush(heap, (now, order, pid))
+                order += 1
+        ready, _, pid = heappop(heap)
+        if suspended is not None and suspended[pid]:
+            parked.add(pid)
+            continue
+        if ready > now:
+            now = ready  # Every process is waiting on a page fault: the CPU idles
+
+        trace = traces[pid]
+        position = start = positions[pid]
+        stop = min(len(trace), position + quanta[pid])
+        faulted = False
+        ticks = 0
+        while position < stop:
+            page = trace[position]
+            position += 1
+            hit = access(pid, page, position)
+            ticks += resident[pid]
+            if not hit:
+                faulted = True
+                break
+        positions[pid] = position
+        frame_ticks[pid] += ticks
+        if resident[pid] > peak_frames[pid]:
+            peak_frames[pid] = resident[pid]
+
+        executed = position - start
+        _add_busy(intervals, now, executed, thrash_window)
+        now += executed
+        done += executed
+        if faulted:
+            faults[pid] += 1
+            interval = intervals[(now - 1) // thrash_window]
+            interval[1] += 1
+            if page in touched[pid]:
+                refaults[pid] += 1
+                interval[2] += 1
+            else:
+                touched[pid].add(page)
+        ready = now + fault_service if faulted else now
+
+        if position == len(trace):
+            finish[pid] = ready
+            memory.release(pid)
+        else:
+            heappush(heap, (ready, order, pid))
+            order += 1
+        if suspended is not None:
+            for resumed in memory.resume():
+                if resumed in parked:
+                    parked.remove(resumed)
+                    heappush(heap, (now, order, resumed))
+                    order += 1
+        if progress is not None and done >= next_report:
+            progress(done)
+            next_report = done + PROGRESS_INTERVAL
+
+    # Trailing fault waits can leave idle intervals after the last busy one
+    elapsed = max(finish)
+    while len(intervals) * thrash_window < elapsed:
+        intervals.append([0, 0, 0])
+    thrashing = []
+    for index, (ticks, interval_faults, interval_refaults) in enumerate(intervals):
+        length = min(elapsed, (index + 1) * thrash_window) - index * thrash_window
+        if ticks < THRASH_UTILIZATION * length and interval_refaults * 2 > interval_faults:
+            thrashing.append(index)
+
+    total_faults = sum(faults)
+    per_process = []
+    for pid, trace in enumerate(traces):
+        per_process.append({
+            "process": pid,
+            "references": len(trace),
+            "faults": faults[pid],
+            "fault_rate": faults[pid] / len(trace),
+            "refaults": refaults[pid],
+            "quantum": quanta[pid],
+            "frames": allocations[pid] if allocations is not None else None,
+            "peak_frames": peak_frames[pid],
+            "mean_frames": frame_ticks[pid] / len(trace),
+            "evictions": memory.evictions[pid],
+            "suspensions": memory.suspensions[pid] if suspended is not None else None,
+            "finish_time": finish[pid],
+        })
+    return {
+        "processes": count,
+        "frames": num_frames,
+        "replacement": replacement,
+        "algorithm": algo,
+        "allocation": allocation if replacement == "local" else None,
+        "references": done,
+        "faults": total_faults,
+        "fault_rate": total_faults / done,
+        "refaults": sum(refaults),
+        "time": elapsed,
+        "cpu_utilization": done / elapsed,
+        "steals": getattr(memory, "steals", None),
+        "suspensions": sum(memory.suspensions) if suspended is not None else None,
+        "intervals": len(intervals),
+        "thrashing_intervals": len(thrashing),
+        "first_thrashing": thrashing[0] * thrash_window if thrashing else None,
+        "thrashing": len(thrashing) * 2 > len(intervals),
+        "per_process": per_process,
+    }
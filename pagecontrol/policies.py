@@ -0,0 +1,684 @@
+import random
+from array import array
+from collections import OrderedDict, deque
+from functools import cache
+from heapq import heapify, heappop, heappush
+from itertools import islice
+
+from .trace import STEP_EVICT, STEP_HIT, STEP_MISS, StepTrace
+
+
+# Result of an access that found the page resident / loaded it into a free frame
+HIT = (True, None)
+MISS = (False, None)
+
+
+# FIFO engine - queue of resident pages plus a set for O(1) membership
+class FIFOPolicy:
+    reorder_on_hit = False
+    requires_future = False
+    randomized = False
+
+    def __init__(self, num_frames):
+        self.num_frames = num_frames
+        self.queue = deque()
+        self.resident = set()
+
+    def access(self, page):
+        if page in self.resident:
+            return HIT
+        self.queue.append(page)
+        self.resident.add(page)
+        if len(self.queue) <= self.num_frames:
+            return MISS
+        evicted_page = self.queue.popleft()  # Oldest page leaves first
+        self.resident.remove(evicted_page)
+        return False, evicted_page
+
+    def frames(self):
+        return list(self.queue)
+
+
+# LRU engine - ordered dict kept in recency order (least recently used first)
+class LRUPolicy:
+    reorder_on_hit = True
+    requires_future = False
+    randomized = False
+
+    def __init__(self, num_frames):
+        self.num_frames = num_frames
+        self.recency = OrderedDict()
+
+    def access(self, page):
+        recency = self.recency
+        if page in recency:
+            recency.move_to_end(page)  # Mark the page as most recently used
+            return HIT
+        recency[page] = None
+        if len(recency) <= self.num_frames:
+            return MISS
+        evicted_page, _ = recency.popitem(last=False)  # Remove the least recently used page
+        return False, evicted_page
+
+    def frames(self):
+        return list(self.recency)
+
+
+# Raised from a progress callback to stop a running simulation
+class SimulationCancelled(Exception):
+    pass
+
+
+# References processed between two progress callbacks
+PROGRESS_INTERVAL = 1 << 15
+
+
+# Drive a policy engine over a reference string.
+# With record_trace the steps are logged into a compact StepTrace, otherwise only the
+# counters are kept (stats-only mode) and None is returned in place of the trace.
+# progress(done) is called every PROGRESS_INTERVAL references; it may raise SimulationCancelled.
+def simulate(policy, reference_string, record_trace=True, progress=None):
+    hits = 0
+    misses = 0
+    access = policy.access
+    references = iter(reference_string)
+    chunk_size = PROGRESS_INTERVAL if progress is not None else None
+
+    if record_trace:
+        trace = StepTrace(policy.num_frames, reorder_on_hit=policy.reorder_on_hit)
+        record_page = trace.pages.append
+        record_status = trace.status.append
+        record_evicted = trace.evicted.append
+    else:
+        trace = None
+
+    while True:
+        done = hits + misses
+        if record_trace:
+            for page in islice(references, chunk_size):
+                hit, evicted_page = access(page)
+                record_page(page)
+                if hit:
+                    hits += 1
+                    record_status(STEP_HIT)
+                    record_evicted(0)
+                elif evicted_page is None:
+                    misses += 1
+                    record_status(STEP_MISS)
+                    record_evicted(0)
+                else:
+                    misses += 1
+                    record_status(STEP_EVICT)
+                    record_evicted(evicted_page)
+        else:
+            for page in islice(references, chunk_size):
+                if access(page)[0]:
+                    hits += 1
+                else:
+                    misses += 1
+        if hits + misses == done:
+            break
+        if progress is not None:
+            progress(hits + misses)
+
+    if hits + misses == 0:
+        raise ValueError("Reference string must not be empty.")
+    hit_ratio = hits / (hits + misses)
+    miss_ratio = misses / (hits + misses)
+    return hits, misses, hit_ratio, miss_ratio, trace
+
+
+# FIFO Paging Algorithm
+def fifo_paging(reference_string, num_frames, record_trace=True, progress=None):
+    return simulate(FIFOPolicy(num_frames), reference_string, record_trace, progress)
+
+
+# LRU Paging Algorithm
+def lru_paging(reference_string, num_frames, record_trace=True, progress=None):
+    return simulate(LRUPolicy(num_frames), reference_string, record_trace, progress)
+
+
+# Optimal needs random access to the future, so streamed traces are packed into an int64 array
+def as_sequence(reference_string):
+    if hasattr(reference_string, "__getitem__") and hasattr(reference_string, "__len__"):
+        return reference_string
+    return array("q", reference_string)
+
+
+# NumPy module, or None when it isn't installed. Imported on first use rather than with the package:
+# loading NumPy takes longer than most CLI commands.
+@cache
+def optional_numpy():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+# For every position, the index of the next reference to the same page (len when never used again)
+def next_use_index(reference_string):
+    n = len(reference_string)
+    next_use = array("q", [n]) * n
+    last_seen = {}
+    for i in range(n - 1, -1, -1):
+        page = reference_string[i]
+        next_use[i] = last_seen.get(page, n)
+        last_seen[page] = i
+    return next_use
+
+
+# Optimal (Belady) engine - resident pages in a max-heap keyed by their next use.
+# Heap entries are (-next_use, load_order, page); an entry is live only while it is the
+# one stored in `resident`, older entries are skipped lazily when they surface.
+class OptimalPolicy:
+    reorder_on_hit = False
+    requires_future = True  # Constructed with the whole reference string
+    randomized = False
+
+    def __init__(self, num_frames, reference_string):
+        self.num_frames = num_frames
+        self.next_use = next_use_index(reference_string)
+        self.position = 0
+        self.loads = 0
+        self.resident = {}  # page -> live heap entry, in load order like the frames list
+        self.heap = []
+
+    def access(self, page):
+        next_use = self.next_use[self.position]
+        self.position += 1
+        resident = self.resident
+        heap = self.heap
+
+        live = resident.get(page)
+        if live is not None:
+            entry = (-next_use, live[1], page)
+            resident[page] = entry
+            heappush(heap, entry)
+            if len(heap) > 2 * self.num_frames + 16:
+                # Drop the stale entries so the heap stays O(frames)
+                heap[:] = resident.values()
+                heapify(heap)
+            return HIT
+
+        entry = (-next_use, self.loads, page)
+        self.loads += 1
+        if len(resident) < self.num_frames:
+            resident[page] = entry
+            heappush(heap, entry)
+            return MISS
+
+        # Evict the page that won't be used for the longest time (earliest loaded on ties)
+        while True:
+            victim = heappop(heap)
+            if resident.get(victim[2]) is victim:
+                break
+        evicted_page = victim[2]
+        del resident[evicted_page]
+        resident[page] = entry
+        heappush(heap, entry)
+        return False, evicted_page
+
+    def frames(self):
+        return list(self.resident)
+
+
+# Optimal Paging Algorithm
+def optimal_paging(reference_string, num_frames, record_trace=True, progress=None):
+    reference_string = as_sequence(reference_string)
+    return simulate(OptimalPolicy(num_frames, reference_string), reference_string, record_trace, progress)
+
+
+# References an online Optimal engine looks ahead by default
+LOOKAHEAD = 1024
+
+# Next use of a reference whose next reference hasn't been fed yet
+NEVER = 1 << 62
+
+
+# Online Optimal engine with a bounded lookahead - Belady's choice made only from the next
+# `lookahead` references. Pages not referenced again inside that window count as never used
+# (least recently used evicted first). References arrive through feed(pages), so the engine can run
+# on a trace that keeps growing: a step is final once `lookahead` later references have been fed.
+# next_use holds absolute positions but is indexed from `base`, the first reference still kept.
+# Resident pages needed inside the window sit in a max-heap keyed by their next use, the others in
+# `outside`, in recency order; `arrivals` moves the latter into the heap as the window reaches them.
+class LookaheadOptimalPolicy(OptimalPolicy):
+    def __init__(self, num_frames, reference_string=(), lookahead=LOOKAHEAD):
+        self.num_frames = num_frames
+        self.lookahead = lookahead
+        self.next_use = array("q")
+        self.base = 0
+        self.fed = 0
+        self.last_fed = {}  # page -> absolute position it was last fed at, from `base` on
+        self.position = 0  # Index into next_use of the next access
+        self.resident = {}  # page -> its next use, in load order like the frames list
+        self.heap = []  # (-next_use, page) of pages needed inside the window; stale entries skipped lazily
+        self.outside = OrderedDict()  # Pages not needed inside the window, least recently used first
+        self.arrivals = []  # (next_use, page) of the pages in `outside` whose next use is known
+        self.feed(reference_string)
+
+    def access(self, page):
+        next_use = self.next_use[self.position]
+        horizon = self.base + self.position + self.lookahead  # Last reference inside the window
+        self.position += 1
+        resident = self.resident
+        outside = self.outside
+        heap = self.heap
+
+        # Pages whose next use the window has reached are ranked by it from now on
+        arrivals = self.arrivals
+        while arrivals and arrivals[0][0] <= horizon:
+            use, waiting = heappop(arrivals)
+            if resident.get(waiting) == use and waiting in outside:
+                del outside[waiting]
+                heappush(heap, (-use, waiting))
+
+        if page in resident:
+            outside.pop(page, None)
+            result = HIT
+        elif len(resident) < self.num_frames:
+            result = MISS
+        else:
+            if outside:
+                evicted_page = next(iter(outside))
+                del outside[evicted_page]
+            else:
+                while True:
+                    use, evicted_page = heappop(heap)
+                    if resident.get(evicted_page) == -use:
+                        break
+            del resident[evicted_page]
+            result = (False, evicted_page)
+
+        resident[page] = next_use
+        if next_use <= horizon:
+            heappush(heap, (-next_use, page))
+        else:
+            outside[page] = None
+            if next_use != NEVER:
+                heappush(arrivals, (next_use, page))
+        if len(heap) + len(arrivals) > 2 * self.num_frames + 16:
+            # Drop the stale entries so the heaps stay O(frames)
+            heap[:] = [(-use, page) for page, use in resident.items() if page not in outside]
+            heapify(heap)
+            arrivals[:] = [(resident[page], page) for page in outside if resident[page] != NEVER]
+            heapify(arrivals)
+        return result
+
+    # Append upcoming references to the lookahead window
+    def feed(self, pages):
+        if self.position:
+            # Forget the part of the window that has been consumed
+            del self.next_use[:self.position]
+            self.base += self.position
+            self.position = 0
+
+        next_use = self.next_use
+        last_fed = self.last_fed
+        resident = self.resident
+        base = self.base
+        position = self.fed
+        if len(last_fed) > 2 * (position - base) + 1024:
+            # Pages last fed before `base` are only looked up through `resident` below
+            self.last_fed = last_fed = {page: fed for page, fed in last_fed.items() if fed >= base}
+        for page in pages:
+            previous = last_fed.get(page, -1)
+            if previous >= base:
+                next_use[previous - base] = position
+            elif resident.get(page) == NEVER:
+                # Resident since an access whose next use wasn't known yet
+                resident[page] = position
+                heappush(self.arrivals, (position, page))
+            next_use.append(NEVER)
+            last_fed[page] = position
+            position += 1
+        self.fed = position
+
+
+# Random engine - evicts a uniformly chosen resident page.
+# Pages live in a slot list with a page -> slot index so the victim is replaced in place.
+class RandomPolicy:
+    reorder_on_hit = False
+    requires_future = False
+    randomized = True  # Constructed with a seed for its victim choices
+
+    def __init__(self, num_frames, seed=None):
+        self.num_frames = num_frames
+        self.slots = []
+        self.slot_of = {}
+        self.rng = random.Random(seed)
+
+    def access(self, page):
+        slot_of = self.slot_of
+        if page in slot_of:
+            return HIT
+        slots = self.slots
+        if len(slots) < self.num_frames:
+            slot_of[page] = len(slots)
+            slots.append(page)
+            return MISS
+        slot = self.rng.randrange(len(slots))
+        evicted_page = slots[slot]
+        del slot_of[evicted_page]
+        slots[slot] = page
+        slot_of[page] = slot
+        return False, evicted_page
+
+    def frames(self):
+        return list(self.slots)
+
+
+# Random Paging Algorithm
+def random_paging(reference_string, num_frames, record_trace=True, progress=None, seed=None):
+    return simulate(RandomPolicy(num_frames, seed), reference_string, record_trace, progress)
+
+
+# CLOCK (second chance) engine - circular buffer of frames with a reference bit per frame.
+# The hand clears set bits as it passes, so each bit is cleared at most once per set: O(1) amortized.
+class ClockPolicy:
+    reorder_on_hit = False
+    requires_future = False
+    randomized = False
+
+    def __init__(self, num_frames):
+        self.num_frames = num_frames
+        self.slots = []
+        self.referenced = bytearray(num_frames)
+        self.slot_of = {}
+        self.hand = 0
+
+    def access(self, page):
+        slot_of = self.slot_of
+        slot = slot_of.get(page)
+        if slot is not None:
+            self.referenced[slot] = 1  # Give the page a second chance
+            return HIT
+
+        slots = self.slots
+        if len(slots) < self.num_frames:
+            slot_of[page] = len(slots)
+            self.referenced[len(slots)] = 1
+            slots.append(page)
+            return MISS
+
+        referenced = self.referenced
+        hand = self.hand
+        while referenced[hand]:
+            referenced[hand] = 0
+            hand = (hand + 1) % self.num_frames
+        evicted_page = slots[hand]
+        del slot_of[evicted_page]
+        slots[hand] = page
+        slot_of[page] = hand
+        referenced[hand] = 1
+        self.hand = (hand + 1) % self.num_frames
+        return False, evicted_page
+
+    def frames(self):
+        return list(self.slots)
+
+
+# LFU engine - O(1) frequency buckets; ties within a frequency go to the least recently used page
+class LFUPolicy:
+    reorder_on_hit = False
+    requires_future = False
+    randomized = False
+
+    def __init__(self, num_frames):
+        self.num_frames = num_frames
+        self.count = {}  # page -> reference count while resident
+        self.buckets = {}  # count -> OrderedDict of pages, least recently used first
+        self.min_count = 0
+
+    def access(self, page):
+        count = self.count
+        buckets = self.buckets
+        uses = count.get(page)
+        if uses is not None:
+            bucket = buckets[uses]
+            del bucket[page]
+            if not bucket:
+                del buckets[uses]
+                if self.min_count == uses:
+                    self.min_count = uses + 1
+            count[page] = uses + 1
+            buckets.setdefault(uses + 1, OrderedDict())[page] = None
+            return HIT
+
+        evicted_page = None
+        if len(count) >= self.num_frames:
+            bucket = buckets[self.min_count]
+            evicted_page, _ = bucket.popitem(last=False)
+            if not bucket:
+                del buckets[self.min_count]
+            del count[evicted_page]
+        count[page] = 1
+        buckets.setdefault(1, OrderedDict())[page] = None
+        self.min_count = 1
+        return False, evicted_page
+
+    def frames(self):
+        return list(self.count)
+
+
+# ARC engine (Megiddo & Modha) - recency (T1) and frequency (T2) lists of resident pages, with
+# ghost lists B1/B2 of recently evicted pages steering the adaptive target size p of T1
+class ARCPolicy:
+    reorder_on_hit = False
+    requires_future = False
+    randomized = False
+
+    def __init__(self, num_frames):
+        self.num_frames = num_frames
+        self.t1 = OrderedDict()
+        self.t2 = OrderedDict()
+        self.b1 = OrderedDict()
+        self.b2 = OrderedDict()
+        self.p = 0.0
+
+    # Move the LRU page of T1 or T2 to its ghost list and return it
+    def _replace(self, in_b2):
+        t1 = self.t1
+        if t1 and ((in_b2 and len(t1) == self.p) or len(t1) > self.p):
+            evicted_page, _ = t1.popitem(last=False)
+            self.b1[evicted_page] = None
+        else:
+            evicted_page, _ = self.t2.popitem(last=False)
+            self.b2[evicted_page] = None
+        return evicted_page
+
+    def access(self, page):
+        t1, t2, b1, b2 = self.t1, self.t2, self.b1, self.b2
+        c = self.num_frames
+
+        if page in t1:
+            del t1[page]
+            t2[page] = None
+            return HIT
+        if page in t2:
+            t2.move_to_end(page)
+            return HIT
+
+        evicted_page = None
+        if page in b1:
+            self.p = min(c, self.p + max(len(b2) / len(b1), 1))
+            del b1[page]
+            if len(t1) + len(t2) >= c:
+                evicted_page = self._replace(False)
+            t2[page] = None
+            return False, evicted_page
+        if page in b2:
+            self.p = max(0.0, self.p - max(len(b1) / len(b2), 1))
+            del b2[page]
+            if len(t1) + len(t2) >= c:
+                evicted_page = self._replace(True)
+            t2[page] = None
+            return False, evicted_page
+
+        l1 = len(t1) + len(b1)
+        if l1 == c:
+            if len(t1) < c:
+                b1.popitem(last=False)
+                evicted_page = self._replace(False)
+            else:
+                evicted_page, _ = t1.popitem(last=False)
+        elif l1 + len(t2) + len(b2) >= c:
+            if l1 + len(t2) + len(b2) >= 2 * c:
+                b2.popitem(last=False)
+            if len(t1) + len(t2) >= c:
+                evicted_page = self._replace(False)
+        t1[page] = None
+        return False, evicted_page
+
+    def frames(self):
+        return list(self.t1) + list(self.t2)
+
+
+# 2Q engine (Johnson & Shasha, full version) - new pages enter the FIFO A1in; pages re-referenced
+# after falling out of it (remembered in the ghost FIFO A1out) are promoted to the LRU list Am
+class TwoQPolicy:
+    reorder_on_hit = False
+    requires_future = False
+    randomized = False
+
+    def __init__(self, num_frames):
+        self.num_frames = num_frames
+        self.in_size = max(1, num_frames // 4)
+        self.out_size = max(1, num_frames // 2)
+        self.a1in = OrderedDict()
+        self.a1out = OrderedDict()
+        self.am = OrderedDict()
+
+    def access(self, page):
+        a1in, a1out, am = self.a1in, self.a1out, self.am
+        if page in am:
+            am.move_to_end(page)
+            return HIT
+        if page in a1in:
+            return HIT
+
+        # Check the ghost queue before reclaiming a frame, since the reclaim can push pages out of it
+        remembered = page in a1out
+        if remembered:
+            del a1out[page]
+
+        evicted_page = None
+        if len(a1in) + len(am) >= self.num_frames:
+            if len(a1in) > self.in_size or not am:
+                evicted_page, _ = a1in.popitem(last=False)
+                a1out[evicted_page] = None
+                if len(a1out) > self.out_size:
+                    a1out.popitem(last=False)
+            else:
+                evicted_page, _ = am.popitem(last=False)
+
+        if remembered:
+            am[page] = None
+        else:
+            a1in[page] = None
+        return False, evicted_page
+
+    def frames(self):
+        return list(self.a1in) + list(self.am)
+
+
+# LIRS engine (Jiang & Zhang). Pages with a low inter-reference recency (LIR) own most frames;
+# the rest hold resident HIR pages in the FIFO queue Q. The recency stack S also keeps a bounded
+# number of non-resident HIR pages, so a quick re-reference can promote them to LIR.
+class LIRSPolicy:
+    reorder_on_hit = False
+    requires_future = False
+    randomized = False
+
+    def __init__(self, num_frames):
+        self.num_frames = num_frames
+        self.hir_size = max(1, num_frames // 100)
+        self.lir_size = num_frames - self.hir_size
+        self.ghost_size = 2 * num_frames
+        self.stack = OrderedDict()  # S, bottom (oldest) first
+        self.queue = OrderedDict()  # Q, resident HIR pages, front first
+        self.lir = set()
+        self.ghosts = OrderedDict()  # Non-resident HIR pages still in S, oldest first
+
+    # Pop entries off the bottom of S until a LIR page is at the bottom
+    def _prune(self):
+        stack = self.stack
+        while stack:
+            bottom = next(iter(stack))
+            if bottom in self.lir:
+                break
+            del stack[bottom]
+            self.ghosts.pop(bottom, None)
+
+    # Turn a page into LIR, moving the bottom LIR page to the end of Q when there are too many
+    def _promote(self, page):
+        self.lir.add(page)
+        self.stack[page] = None
+        self.stack.move_to_end(page)
+        self._prune()
+        if len(self.lir) > self.lir_size:
+            bottom = next(iter(self.stack))
+            self.lir.remove(bottom)
+            del self.stack[bottom]
+            self.queue[bottom] = None
+            self._prune()
+
+    def access(self, page):
+        stack, queue, lir = self.stack, self.queue, self.lir
+
+        if page in lir:
+            stack.move_to_end(page)
+            self._prune()
+            return HIT
+
+        if page in queue:
+            if page in stack:
+                del queue[page]
+                self._promote(page)
+            else:
+                stack[page] = None
+                queue.move_to_end(page)
+            return HIT
+
+        if len(lir) < self.lir_size:
+            # Warm-up: the first pages fill the LIR set
+            self.ghosts.pop(page, None)
+            self._promote(page)
+            return MISS
+
+        # Check S before freeing a frame, since trimming the ghosts can drop pages from it
+        remembered = page in stack
+        if remembered:
+            del self.ghosts[page]
+
+        evicted_page = None
+        if len(lir) + len(queue) >= self.num_frames:
+            evicted_page, _ = queue.popitem(last=False)
+            if evicted_page in stack:
+                self.ghosts[evicted_page] = None
+                if len(self.ghosts) > self.ghost_size:
+                    oldest, _ = self.ghosts.popitem(last=False)
+                    del stack[oldest]
+
+        if remembered:
+            # Re-referenced while still in S: its reuse distance beats the bottom LIR page
+            self._promote(page)
+        else:
+            stack[page] = None
+            queue[page] = None
+        return False, evicted_page
+
+    def frames(self):
+        return list(self.lir) + list(self.queue)
+
+
+# Parse a space separated CPU reference string into page numbers
+def parse_reference_string(text):
+    try:
+        reference_string = list(map(int, text.split()))
+    except ValueError:
+        raise ValueError("Reference string must contain integers separated by spaces.") from None
+    if not reference_string:
+        raise ValueError("Reference string must not be empty.")
+    return reference_string
@@ -0,0 +1,80 @@
+from functools import partial
+
+from .policies import (
+    ARCPolicy,
+    ClockPolicy,
+    FIFOPolicy,
+    LFUPolicy,
+    LIRSPolicy,
+    LookaheadOptimalPolicy,
+    LRUPolicy,
+    OptimalPolicy,
+    RandomPolicy,
+    TwoQPolicy,
+    as_sequence,
+    simulate,
+)
+
+# Policy classes by display name, in the order they appear in the GUI and comparison table
+POLICIES = {}
+
+# Paging functions by display name:
+# f(reference_string, num_frames, record_trace=True, progress=None, seed=None)
+ALGORITHMS = {}
+
+# Short names accepted on the command line
+ALGORITHM_ALIASES = {}
+
+
+# Add a replacement policy to the registry.
+# policy_class(num_frames) - or policy_class(num_frames, reference_string) when its requires_future
+# flag is set, and with a seed keyword when its randomized flag is set - must provide
+# access(page) -> (hit, evicted page or None) and frames().
+def register_policy(name, policy_class, aliases=()):
+    POLICIES[name] = policy_class
+    ALGORITHMS[name] = partial(run_policy, name)
+    for alias in aliases:
+        ALGORITHM_ALIASES[alias.lower()] = name
+
+
+# Map a display name or alias to its display name
+def resolve_algorithm(name):
+    if name in POLICIES:
+        return name
+    try:
+        return ALGORITHM_ALIASES[name.lower()]
+    except KeyError:
+        raise ValueError(f"Unknown paging algorithm: {name}") from None
+
+
+# Create a fresh policy engine for the given number of frames.
+# The seed only affects randomized policies; None seeds them from the system.
+def make_policy(name, num_frames, reference_string=None, seed=None):
+    policy_class = POLICIES[resolve_algorithm(name)]
+    if policy_class.requires_future:
+        if reference_string is None:
+            raise ValueError(f"{name} needs the whole reference string in advance.")
+        return policy_class(num_frames, reference_string)
+    if policy_class.randomized:
+        return policy_class(num_frames, seed=seed)
+    return policy_class(num_frames)
+
+
+# Run a registered policy over a reference string; same results as the *_paging functions
+def run_policy(name, reference_string, num_frames, record_trace=True, progress=None, seed=None):
+    if POLICIES[resolve_algorithm(name)].requires_future:
+        reference_string = as_sequence(reference_string)
+    return simulate(make_policy(name, num_frames, reference_string, seed), reference_string, record_trace,
+                    progress)
+
+
+register_policy("FIFO", FIFOPolicy, aliases=["fifo"])
+register_policy("LRU", LRUPolicy, aliases=["lru"])
+register_policy("Optimal (OPT)", OptimalPolicy, aliases=["opt", "optimal"])
+register_policy("Random (RAND)", RandomPolicy, aliases=["rand", "random"])
+register_policy("CLOCK", ClockPolicy, aliases=["clock", "second-chance"])
+register_policy("LFU", LFUPolicy, aliases=["lfu"])
+register_policy("ARC", ARCPolicy, aliases=["arc"])
+register_policy("2Q", TwoQPolicy, aliases=["2q", "twoq"])
+register_policy("LIRS", LIRSPolicy, aliases=["lirs"])
+register_policy("OPT (Lookahead)", LookaheadOptimalPolicy, aliases=["opt-lookahead", "lookahead"])
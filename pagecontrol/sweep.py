@@ -0,0 +1,96 @@
+import os
+from array import array
+
+from .cache import trace_fingerprint
+from .registry import ALGORITHMS, resolve_algorithm
+
+# Columns of the rows yielded by run_sweep
+SWEEP_COLUMNS = ["trace", "algorithm", "frames", "hits", "misses", "hit_ratio", "miss_ratio"]
+
+# Shared traces already attached in this worker process: name -> (SharedMemory, memoryview)
+_attached = {}
+
+# multiprocessing and the process pool are imported inside the functions below rather than here,
+# since only sweeps and pooled replicas need them and importing them slows down every CLI command.
+
+
+# Copy a trace into a shared memory block of int64 values; returns (block, length)
+def share_trace(reference_string):
+    pages = array("q", reference_string)
+    if not pages:
+        raise ValueError("Reference string must not be empty.")
+    from multiprocessing import shared_memory
+
+    block = shared_memory.SharedMemory(create=True, size=len(pages) * pages.itemsize)
+    block.buf[:len(pages) * pages.itemsize] = memoryview(pages).cast("B")
+    return block, len(pages)
+
+
+def _attach_trace(name, length):
+    if name not in _attached:
+        from multiprocessing import shared_memory
+
+        # Pool workers share the parent's resource tracker, so attaching doesn't take ownership
+        block = shared_memory.SharedMemory(name=name)
+        _attached[name] = (block, block.buf[:length * 8].cast("q"))
+    return _attached[name][1]
+
+
+def _run_job(trace_index, name, length, algo, num_frames, seed=None):
+    reference_string = _attach_trace(name, length)
+    hits, misses, hit_ratio, miss_ratio, _ = ALGORITHMS[algo](reference_string, num_frames, record_trace=False,
+                                                              seed=seed)
+    return trace_index, algo, num_frames, hits, misses, hit_ratio, miss_ratio
+
+
+# Run every (trace, algorithm, frame count) combination across a process pool.
+# Traces are placed in shared memory once instead of being pickled for every job, and rows
+# (trace index, algorithm, frames, hits, misses, hit ratio, miss ratio) are yielded as soon as
+# each job finishes, so results stream back in completion order.
+# With a ResultCache, cached jobs are yielded first without being run and new results are stored.
+# The seed makes randomized policies reproducible (and cacheable).
+def run_sweep(traces, frame_counts, algorithms=None, workers=None, cache=None, seed=None):
+    algorithms = [resolve_algorithm(name) for name in (algorithms or ALGORITHMS)]
+    frame_counts = list(frame_counts)
+    if not frame_counts or min(frame_counts) <= 0:
+        raise ValueError("Frames must be positive integers.")
+
+    blocks = []
+    try:
+        jobs = []
+        for trace_index, reference_string in enumerate(traces):
+            block, length = share_trace(reference_string)
+            blocks.append(block)
+            fingerprint = trace_fingerprint(block.buf[:length * 8].cast("q")) if cache is not None else None
+            for algo in algorithms:
+                for num_frames in frame_counts:
+                    key = cache.key(fingerprint, algo, num_frames, seed) if cache is not None else None
+                    cached = cache.get(key) if key is not None else None
+                    if cached is not None:
+                        yield (trace_index, algo, num_frames) + cached[:4]
+                    else:
+                        jobs.append((trace_index, block.name, length, algo, num_frames, key))
+
+        if not jobs:
+            return
+        from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+        workers = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            pending = {pool.submit(_run_job, *job[:5], seed): job[5] for job in jobs}
+            try:
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        key = pending.pop(future)
+                        row = future.result()
+                        if key is not None:
+                            cache.put(key, row[3:] + (None,))
+                        yield row
+            finally:
+                for future in pending:
+                    future.cancel()
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
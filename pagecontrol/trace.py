@@ -0,0 +1,160 @@
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+from itertools import compress
+
+# Per-step status codes stored in StepTrace.status
+STEP_MISS = 0  # Page loaded into a free frame
+STEP_HIT = 1
+STEP_EVICT = 2  # Page loaded after evicting StepTrace.evicted[step]
+
+
+# Compact step-by-step record of a simulation run.
+# One (page, status, evicted page) record per step is kept in typed arrays; the frame and
+# swap contents of a step are rebuilt on demand by replaying from the nearest checkpoint.
+# Indexing returns the (frames, status, swap_space, step) tuples the GUI displays.
+class StepTrace:
+    def __init__(self, num_frames, reorder_on_hit=False, checkpoint_interval=None):
+        self.num_frames = num_frames
+        self.reorder_on_hit = reorder_on_hit  # Hits move the page to the end (LRU order)
+        self.checkpoint_interval = checkpoint_interval or max(1024, 8 * num_frames)
+        self.pages = array("q")
+        self.status = array("b")
+        self.evicted = array("q")
+        self.checkpoints = [array("q")]  # Frames before step i * checkpoint_interval
+        self.checkpoint_swaps = [0]  # Swap space size before step i * checkpoint_interval
+        self.eviction_steps = array("q")  # Indices of the STEP_EVICT steps, built on demand
+        self.indexed_steps = 0  # Steps covered by eviction_steps
+
+    def __len__(self):
+        return len(self.pages)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self.pages)
+        if not 0 <= index < len(self.pages):
+            raise IndexError("step index out of range")
+        return self.frames_at(index), self.status_text(index), self.swap_space_at(index), index + 1
+
+    def __iter__(self):
+        # Sequential replay, so walking the whole trace doesn't restart from a checkpoint each step
+        frames = OrderedDict()
+        swap_space = []
+        for index in range(len(self.pages)):
+            self._apply(frames, index)
+            if self.status[index] == STEP_EVICT:
+                swap_space.append(self.evicted[index])
+            yield list(frames), self.status_text(index), list(swap_space), index + 1
+
+    def _apply(self, frames, index):
+        page = self.pages[index]
+        status = self.status[index]
+        if status == STEP_HIT:
+            if self.reorder_on_hit:
+                frames.move_to_end(page)
+        else:
+            if status == STEP_EVICT:
+                del frames[self.evicted[index]]
+            frames[page] = None
+
+    # Append the steps of another trace of the same run, e.g. one recorded for newly added references
+    def extend(self, steps):
+        self.pages.extend(steps.pages)
+        self.status.extend(steps.status)
+        self.evicted.extend(steps.evicted)
+
+    # Drop every step from the given index on
+    def truncate(self, length):
+        del self.pages[length:]
+        del self.status[length:]
+        del self.evicted[length:]
+        # Checkpoint i only depends on the steps before i * checkpoint_interval
+        keep = length // self.checkpoint_interval + 1
+        del self.checkpoints[keep:]
+        del self.checkpoint_swaps[keep:]
+        del self.eviction_steps[bisect_right(self.eviction_steps, length - 1):]
+        self.indexed_steps = min(self.indexed_steps, length)
+
+    # Replay forward until the checkpoint covering the given step exists
+    def _build_checkpoints(self, checkpoint):
+        interval = self.checkpoint_interval
+        while len(self.checkpoints) <= checkpoint:
+            last = len(self.checkpoints) - 1
+            frames = OrderedDict.fromkeys(self.checkpoints[last])
+            for step in range(last * interval, (last + 1) * interval):
+                self._apply(frames, step)
+            self.checkpoints.append(array("q", frames))
+            self.checkpoint_swaps.append(
+                self.checkpoint_swaps[last] + self.status[last * interval:(last + 1) * interval].count(STEP_EVICT))
+
+    # Build the checkpoints and the eviction index of every step recorded so far. Called on a worker thread
+    # before the trace is shown, so the first jump to the end doesn't replay the whole trace on the GUI thread.
+    def build_checkpoints(self):
+        self._build_checkpoints(len(self.pages) // self.checkpoint_interval)
+        self._index_evictions()
+
+    # Add the evictions of the steps recorded since the last call to eviction_steps
+    def _index_evictions(self):
+        start = self.indexed_steps
+        if start < len(self.status):
+            self.eviction_steps.extend(compress(range(start, len(self.status)),
+                                                (code == STEP_EVICT for code in self.status[start:])))
+            self.indexed_steps = len(self.status)
+
+    # Frame contents after the given (0-based) step
+    def frames_at(self, index):
+        interval = self.checkpoint_interval
+        checkpoint = index // interval
+        self._build_checkpoints(checkpoint)
+
+        frames = OrderedDict.fromkeys(self.checkpoints[checkpoint])
+        for step in range(checkpoint * interval, index + 1):
+            self._apply(frames, step)
+        return list(frames)
+
+    # Frame contents for an increasing sequence of steps, replaying forward between nearby steps
+    def iter_frames(self, indices):
+        frames = None
+        previous = None
+        for index in indices:
+            if frames is None or index - previous > self.checkpoint_interval:
+                frames = OrderedDict.fromkeys(self.frames_at(index))
+            else:
+                for step in range(previous + 1, index + 1):
+                    self._apply(frames, step)
+            previous = index
+            yield list(frames)
+
+    # Number of pages in the swap space after the given step
+    def swap_count_at(self, index):
+        checkpoint = index // self.checkpoint_interval
+        self._build_checkpoints(checkpoint)
+        start = checkpoint * self.checkpoint_interval
+        return self.checkpoint_swaps[checkpoint] + self.status[start:index + 1].count(STEP_EVICT)
+
+    # The most recent `limit` pages in the swap space after the given step, oldest first.
+    # A binary search in the eviction index finds them in O(log n + limit), however sparse evictions are.
+    def swap_tail_at(self, index, limit):
+        self._index_evictions()
+        end = bisect_right(self.eviction_steps, index)
+        evicted = self.evicted
+        return [evicted[step] for step in self.eviction_steps[max(0, end - limit):end]]
+
+    # Indices of the steps whose status is one of the given codes, e.g. (STEP_MISS, STEP_EVICT)
+    def find_steps(self, codes):
+        codes = frozenset(codes)
+        return array("q", compress(range(len(self.status)), map(codes.__contains__, self.status)))
+
+    # Pages evicted up to and including the given step, oldest first
+    def swap_space_at(self, index):
+        status = self.status
+        evicted = self.evicted
+        return [evicted[step] for step in range(index + 1) if status[step] == STEP_EVICT]
+
+    def status_text(self, index):
+        status = self.status[index]
+        if status == STEP_HIT:
+            return " --> Hit"
+        if status == STEP_MISS:
+            return " --> Miss (No change)"
+        return f" --> Miss (Removed -> {self.evicted[index]})"
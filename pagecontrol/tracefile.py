@@ -0,0 +1,99 @@
+import gzip
+import mmap
+import sys
+from array import array
+
+# Binary trace formats: raw little-endian integers, one page number per item
+BINARY_FORMATS = {"int32": "i", "int64": "q"}
+TRACE_FORMATS = ["text", *BINARY_FORMATS]
+
+GZIP_MAGIC = b"\x1f\x8b"
+CHUNK_SIZE = 1 << 20
+
+
+# Open a text trace for reading, transparently decompressing gzip files
+def open_text_trace(path):
+    with open(path, "rb") as f:
+        compressed = f.read(2) == GZIP_MAGIC
+    if compressed:
+        return gzip.open(path, "rb")
+    return open(path, "rb")
+
+
+# Stream the page numbers of a whitespace separated text trace (plain or gzip).
+# The file is read in fixed-size chunks, so memory stays bounded even for a single huge line.
+def iter_text_trace(path):
+    with open_text_trace(path) as f:
+        tail = b""
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            tokens = (tail + chunk).split()
+            # The last token may continue in the next chunk
+            if chunk[-1:].isspace():
+                tail = b""
+            else:
+                tail = tokens.pop() if tokens else b""
+            try:
+                yield from map(int, tokens)
+            except ValueError:
+                raise ValueError(f"Trace file {path} must contain integers separated by whitespace.") from None
+        if tail:
+            try:
+                yield int(tail)
+            except ValueError:
+                raise ValueError(f"Trace file {path} must contain integers separated by whitespace.") from None
+
+
+# Map a raw little-endian int32/int64 trace into memory and return a zero-copy memoryview of it.
+# The view is a sequence, so it can be indexed (Optimal) as well as iterated.
+def open_binary_trace(path, fmt="int64"):
+    try:
+        typecode = BINARY_FORMATS[fmt]
+    except KeyError:
+        raise ValueError(f"Unknown binary trace format: {fmt}") from None
+
+    with open(path, "rb") as f:
+        size = f.seek(0, 2)
+        if size == 0:
+            raise ValueError(f"Trace file {path} is empty.")
+        if size % array(typecode).itemsize:
+            raise ValueError(f"Trace file {path} is not a whole number of {fmt} values.")
+        if sys.byteorder != "little":
+            # Native order differs from the file, so the values have to be swapped into a copy
+            pages = array(typecode)
+            f.seek(0)
+            pages.frombytes(f.read())
+            pages.byteswap()
+            return memoryview(pages)
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return memoryview(mapped).cast(typecode)
+
+
+# Load a trace file in the given format: "text" (optionally gzip), "int32" or "int64"
+def load_trace(path, fmt="text"):
+    if fmt == "text":
+        return iter_text_trace(path)
+    return open_binary_trace(path, fmt)
+
+
+# Write page numbers as a raw little-endian binary trace
+def write_binary_trace(path, reference_string, fmt="int64"):
+    try:
+        typecode = BINARY_FORMATS[fmt]
+    except KeyError:
+        raise ValueError(f"Unknown binary trace format: {fmt}") from None
+
+    with open(path, "wb") as f:
+        pages = array(typecode)
+        for page in reference_string:
+            pages.append(page)
+            if len(pages) == CHUNK_SIZE:
+                if sys.byteorder != "little":
+                    pages.byteswap()
+                f.write(pages)
+                del pages[:]
+        if sys.byteorder != "little":
+            pages.byteswap()
+        f.write(pages)
@@ -0,0 +1,149 @@
+import inspect
+import random
+from array import array
+from itertools import accumulate
+
+from .policies import optional_numpy
+
+
+# Synthetic reference strings, reproducible from a seed and returned as int64 arrays (the
+# engine's compact format). With NumPy installed they are generated in bulk; without it the
+# same distributions come from the random module, so a seed reproduces within one backend.
+
+# NumPy int64 array -> array("q") without going through Python ints
+def _pack(references):
+    return array("q", references.astype("int64", copy=False).tobytes())
+
+
+# Every page equally likely
+def uniform_workload(length, pages=10000, seed=0):
+    np = optional_numpy()
+    if np is not None:
+        return _pack(np.random.default_rng(seed).integers(0, pages, length))
+    rng = random.Random(seed)
+    return array("q", (rng.randrange(pages) for _ in range(length)))
+
+
+# Page of rank i (0-based) referenced with probability proportional to 1 / (i + 1)**skew
+def zipf_workload(length, pages=10000, skew=1.0, seed=0):
+    np = optional_numpy()
+    if np is not None:
+        rng = np.random.default_rng(seed)
+        cum_weights = np.cumsum(1.0 / np.arange(1, pages + 1) ** skew)
+        return _pack(np.searchsorted(cum_weights, rng.random(length) * cum_weights[-1], side="right"))
+    rng = random.Random(seed)
+    cum_weights = list(accumulate(1 / rank ** skew for rank in range(1, pages + 1)))
+    return array("q", rng.choices(range(pages), cum_weights=cum_weights, k=length))
+
+
+# One sequential pass over fresh pages - nothing is ever referenced twice
+def scan_workload(length, start=0, seed=0):
+    np = optional_numpy()
+    if np is not None:
+        return _pack(np.arange(start, start + length))
+    return array("q", range(start, start + length))
+
+
+# Sequential scan over all pages, repeated - the classic worst case for LRU
+def loop_workload(length, pages=10000, seed=0):
+    np = optional_numpy()
+    if np is not None:
+        return _pack(np.arange(length) % pages)
+    return array("q", (i % pages for i in range(length)))
+
+
+# Uniform references inside a working set that jumps to a new region every phase
+def phase_workload(length, pages=10000, working_set=500, phase_length=10000, seed=0):
+    np = optional_numpy()
+    working_set = min(working_set, pages)
+    phases = -(-length // phase_length)
+    if np is not None:
+        rng = np.random.default_rng(seed)
+        bases = rng.integers(0, pages - working_set + 1, phases)
+        return _pack(np.repeat(bases, phase_length)[:length] + rng.integers(0, working_set, length))
+    rng = random.Random(seed)
+    references = array("q")
+    for _ in range(phases):
+        base = rng.randrange(pages - working_set + 1)
+        count = min(phase_length, length - len(references))
+        references.extend(base + rng.randrange(working_set) for _ in range(count))
+    return references
+
+
+# Interleave several workloads: each reference comes from component i with probability weight_i.
+# components is a list of (workload name, weight, params dict). Each component keeps its own order
+# and its pages are shifted past the previous components' pages, so the components never overlap.
+def mixed_workload(length, components, seed=0):
+    np = optional_numpy()
+    if not components:
+        raise ValueError("A mixed workload needs at least one component.")
+    weights = [weight for _, weight, _ in components]
+    if min(weights) < 0 or sum(weights) <= 0:
+        raise ValueError("Mixed workload weights must be non-negative and not all zero.")
+
+    if np is not None:
+        rng = np.random.default_rng(seed)
+        probabilities = np.asarray(weights, dtype=float) / sum(weights)
+        choice = rng.choice(len(components), size=length, p=probabilities)
+        references = np.empty(length, dtype=np.int64)
+        offset = 0
+        for index, (name, _, params) in enumerate(components):
+            positions = np.flatnonzero(choice == index)
+            if not len(positions):
+                continue
+            part = np.frombuffer(generate_workload(name, len(positions), seed=seed + index + 1, **params),
+                                 dtype=np.int64)
+            references[positions] = part + offset
+            offset += int(part.max()) + 1
+        return _pack(references)
+
+    rng = random.Random(seed)
+    choice = rng.choices(range(len(components)), weights=weights, k=length)
+    parts = []
+    offset = 0
+    for index, (name, _, params) in enumerate(components):
+        count = choice.count(index)
+        part = generate_workload(name, count, seed=seed + index + 1, **params) if count else array("q")
+        parts.append((iter(part), offset))
+        if count:
+            offset += max(part) + 1
+    return array("q", (next(parts[index][0]) + parts[index][1] for index in choice))
+
+
+WORKLOADS = {
+    "uniform": uniform_workload,
+    "zipf": zipf_workload,
+    "scan": scan_workload,
+    "loop": loop_workload,
+    "phases": phase_workload,
+    "mix": mixed_workload,
+}
+
+
+# Generate a named workload; params are passed to the generator (pages, skew, working_set, ...)
+def generate_workload(name, length, seed=0, **params):
+    try:
+        generator = WORKLOADS[name]
+    except KeyError:
+        raise ValueError(f"Unknown workload: {name}") from None
+    if length <= 0:
+        raise ValueError("Workload length must be a positive integer.")
+    accepted = inspect.signature(generator).parameters
+    for param in params:
+        if param not in accepted:
+            raise ValueError(f"The {name} workload does not take a {param} parameter.")
+    return generator(length, seed=seed, **params)
+
+
+# Parse a mix specification such as "zipf:0.7,scan:0.3" into mixed_workload components
+def parse_mix(spec):
+    components = []
+    for part in spec.split(","):
+        name, _, weight = part.strip().partition(":")
+        if name not in WORKLOADS or name == "mix":
+            raise ValueError(f"Unknown workload in mix: {name}")
+        try:
+            components.append((name, float(weight) if weight else 1.0, {}))
+        except ValueError:
+            raise ValueError(f"Invalid weight in mix: {part}") from None
+    return components